@@ -0,0 +1,64 @@
+"""
+Benchmark the unit conversion fast path against pint.
+
+Run with python benchmarks/bench_units.py (pint must be installed).
+"""
+
+import subprocess
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from forgery.constants import data_path
+from forgery.units import convert
+
+SURVEY_PATH = data_path / "well_data" / "16B_survey.csv"
+
+
+def _import_time(statement, repeat=5):
+    """Get the best wall time (s) to run statement in a fresh interpreter."""
+    code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    times = [
+        float(subprocess.check_output([sys.executable, "-c", code]))
+        for _ in range(repeat)
+    ]
+    return min(times)
+
+
+def _convert_pint(values):
+    """The previous conversion of a survey's columns."""
+    import pint
+
+    foot, meter = pint.Unit("ft"), pint.Unit("m")
+    return [(values[:, i] * foot).to(meter).magnitude for i in range(values.shape[1])]
+
+
+def _convert_fast(values):
+    """The conversion of a survey's columns with plain factors."""
+    return convert(values.copy(), "ft", inplace=True)
+
+
+def main():
+    """Print the import and per survey conversion latency."""
+    pint_import = _import_time("import pint; (1 * pint.Quantity('ft')).to('m')")
+    fast_import = _import_time("from forgery.units import convert; convert(1.0, 'ft')")
+    print(
+        f"first conversion incl. import: pint {pint_import * 1e3:.1f} ms, "
+        f"fast path {fast_import * 1e3:.1f} ms"
+    )
+
+    df = pd.read_csv(SURVEY_PATH, skiprows=24, header=None)
+    values = df[[8, 6, 4]].to_numpy(dtype=float)
+    assert np.allclose(np.stack(_convert_pint(values), axis=1), _convert_fast(values))
+    for name, func in [("pint", _convert_pint), ("fast path", _convert_fast)]:
+        number = 1_000
+        seconds = min(timeit.repeat(lambda: func(values), number=number, repeat=5))
+        print(
+            f"per survey ({len(values)} rows) {name}: {seconds / number * 1e6:.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
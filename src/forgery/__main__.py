@@ -0,0 +1,9 @@
+"""
+Allow running forgery with python -m forgery.
+"""
+
+import sys
+
+from forgery.cli import main
+
+sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Asyncio-friendly data loading for the dashboard server.
+
+Loads run in a thread pool so the event loop stays responsive. Concurrent
+requests for the same data share a single in-flight load, and cancelling
+one waiter does not cancel the load for the others. A load is only
+cancelled once all of its waiters are; a load which has already started
+runs to completion (file reads can't be interrupted) and fills the cache.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from forgery.data import csv_data, get_well_data, shp_data
+
+_EXECUTOR = None
+_IN_FLIGHT = {}
+_LOCK = threading.RLock()
+
+
+def _get_executor(executor=None):
+    """Get the executor to use, creating the shared one if needed."""
+    global _EXECUTOR
+    if executor is not None:
+        return executor
+    with _LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(thread_name_prefix="forgery")
+    return _EXECUTOR
+
+
+def _get_load_func(key):
+    """Get a function which loads the data registered under key."""
+    if key == "wells":
+        return get_well_data
+    for loader in (csv_data, shp_data):
+        if key in loader.data_registry:
+            return lambda: loader[key]
+    msg = f"No data registered under {key!r}"
+    raise KeyError(msg)
+
+
+def _forget(key, future):
+    """Remove a finished load from the in-flight registry."""
+    with _LOCK:
+        entry = _IN_FLIGHT.get(key)
+        if entry is not None and entry[0] is future:
+            del _IN_FLIGHT[key]
+
+
+def _submit_shared(key, func, executor=None):
+    """
+    Submit func, or join an identical in-flight load.
+
+    Each call adds a waiter which must be released with _release.
+    """
+    executor = _get_executor(executor)
+    with _LOCK:
+        entry = _IN_FLIGHT.get(key)
+        if entry is None:
+            future = executor.submit(func)
+            entry = _IN_FLIGHT[key] = [future, 0]
+            future.add_done_callback(lambda x: _forget(key, x))
+        entry[1] += 1
+    return entry[0]
+
+
+def _release(key, future, cancelled):
+    """Release a waiter; cancel the load if it was the last one cancelled."""
+    with _LOCK:
+        entry = _IN_FLIGHT.get(key)
+        if entry is None or entry[0] is not future:
+            return
+        entry[1] -= 1
+        if cancelled and not entry[1]:
+            # Only succeeds if the load has not started yet.
+            future.cancel()
+
+
+async def _await_shared(key, func, executor=None):
+    """Await a shared load; cancellation only affects this waiter."""
+    future = _submit_shared(key, func, executor)
+    cancelled = False
+    try:
+        return await asyncio.shield(asyncio.wrap_future(future))
+    except asyncio.CancelledError:
+        cancelled = True
+        raise
+    finally:
+        _release(key, future, cancelled)
+
+
+async def load(key, executor=None):
+    """
+    Load registered data without blocking the event loop.
+
+    Parameters
+    ----------
+    key
+        A key in the csv or shape file registries, or "wells" for the
+        well survey data.
+    executor
+        The executor used to run the load. If None, use a shared thread
+        pool.
+
+    Examples
+    --------
+    >>> events = await load("events")  # doctest: +SKIP
+    """
+    func = _get_load_func(key)
+    for loader in (csv_data, shp_data):
+        if loader.is_loaded(key):
+            return loader[key]
+    return await _await_shared(("load", key), func, executor)
+
+
+def _run_steps(steps, cancelled):
+    """Run a step generator, stopping early once cancelled is set."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as e:
+            return e.value
+        if cancelled.is_set():
+            steps.close()
+            raise asyncio.CancelledError
+
+
+async def build_scene(scene=None, executor=None):
+    """
+    Build the 3D scene without blocking the event loop.
+
+    The data are loaded concurrently, then the plotter is constructed in
+    the executor. If cancelled during the loads, loads with no other waiters
+    that have not started are cancelled and the plotter is never built. If
+    cancelled during construction, the build stops after its current step
+    (when the scene has an iter_build method, else it runs to completion).
+
+    Parameters
+    ----------
+    scene
+        The ForgeVistaScene to build. If None, use the default scene.
+    executor
+        The executor used to run the loading and construction.
+
+    Returns
+    -------
+        The pyvista plotter.
+    """
+    if scene is None:
+        from forgery.vista import ForgeVistaScene
+
+        scene = ForgeVistaScene()
+    keys = ["surface", "granitoid", "faults", "events", "extents", "wells"]
+    await asyncio.gather(*[load(x, executor=executor) for x in keys])
+    loop = asyncio.get_running_loop()
+    executor = _get_executor(executor)
+    if not hasattr(scene, "iter_build"):
+        return await loop.run_in_executor(executor, scene)
+    cancelled = threading.Event()
+    try:
+        return await loop.run_in_executor(
+            executor, _run_steps, scene.iter_build(), cancelled
+        )
+    except asyncio.CancelledError:
+        cancelled.set()
+        raise
@@ -0,0 +1,119 @@
+"""
+Command line interface for forgery.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from forgery.figures import FIGURE_BUILDERS, FIGURE_PATH, build_figures
+
+
+def _build_figures(args):
+    """Build the blog figures, return the exit code."""
+    status = build_figures(
+        output_path=args.output,
+        names=args.names or None,
+        force=args.force,
+        max_workers=args.jobs,
+    )
+    failed = False
+    for name, state in status.items():
+        if isinstance(state, Exception):
+            failed = True
+            state = f"failed ({state!r})"
+        print(f"{name}: {state}")
+    return int(failed)
+
+
+def _export_scene(args):
+    """Export the 3D scene, return the exit code."""
+    from forgery.export import export_scene
+
+    try:
+        report = export_scene(
+            output_path=args.output,
+            formats=args.formats,
+            decimate=args.decimate,
+            quantize=not args.no_quantize,
+        )
+    except ImportError as e:
+        print(f"forgery export-scene: error: {e}", file=sys.stderr)
+        return 1
+    print(report)
+    return 0
+
+
+def get_parser():
+    """Get the argument parser for the forgery command."""
+    parser = argparse.ArgumentParser(prog="forgery", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build-figures", help="Pre-render the blog figures.")
+    build.add_argument(
+        "names",
+        nargs="*",
+        help=f"The figures to build from {list(FIGURE_BUILDERS)} (default: all).",
+    )
+    build.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=FIGURE_PATH,
+        help="The directory in which to write the figures.",
+    )
+    build.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="Rebuild figures even if their inputs are unchanged.",
+    )
+    build.add_argument(
+        "-j", "--jobs", type=int, default=None, help="Number of worker processes."
+    )
+    build.set_defaults(func=_build_figures)
+
+    export = commands.add_parser(
+        "export-scene", help="Export the 3D scene to glTF and vtk.js."
+    )
+    export.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=FIGURE_PATH,
+        help="The directory in which to write the files.",
+    )
+    export.add_argument(
+        "--formats",
+        nargs="+",
+        choices=["glb", "vtksz"],
+        default=["glb", "vtksz"],
+        help="The formats to write.",
+    )
+    export.add_argument(
+        "--decimate",
+        type=float,
+        default=None,
+        help="The fraction of surface triangles to remove.",
+    )
+    export.add_argument(
+        "--no-quantize",
+        action="store_true",
+        help="Store glTF vertex attributes as float32.",
+    )
+    export.set_defaults(func=_export_scene)
+    return parser
+
+
+def main(argv=None):
+    """Run the forgery command line interface."""
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    unknown = set(getattr(args, "names", [])) - set(FIGURE_BUILDERS)
+    if unknown:
+        parser.error(f"unknown figure(s): {sorted(unknown)}")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
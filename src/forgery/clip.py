@@ -0,0 +1,140 @@
+"""
+Fast point in polygon tests for clipping meshes and events to extents.
+
+The polygon is prepared once and covered by a coarse raster whose cells are
+classified as inside, outside, or on the boundary. Points are first rejected
+by the polygon's bounding box, then resolved by their cell; only points in
+boundary cells need the exact test.
+"""
+
+import hashlib
+from functools import cache
+
+import numpy as np
+import shapely
+
+# Cell classification codes for the coarse raster.
+_OUTSIDE, _INSIDE, _BOUNDARY = 0, 1, 2
+
+# The maximum number of masks held in the cache.
+_MAX_CACHED_MASKS = 32
+
+
+class PolygonClipper:
+    """
+    A reusable point in polygon test.
+
+    Parameters
+    ----------
+    polygon
+        The shapely polygon (or multipolygon) to test against.
+    grid_size
+        The number of raster cells along each axis of the bounding box.
+    """
+
+    def __init__(self, polygon, grid_size=64):
+        self.polygon = polygon
+        shapely.prepare(self.polygon)
+        self.grid_size = grid_size
+        self.bounds = np.asarray(polygon.bounds, dtype=np.float64)
+        self._cell_codes = self._get_cell_codes()
+        self._mask_cache = {}
+
+    def _get_cell_codes(self):
+        """Classify each raster cell against the polygon."""
+        xmin, ymin, xmax, ymax = self.bounds
+        x_edges = np.linspace(xmin, xmax, self.grid_size + 1)
+        y_edges = np.linspace(ymin, ymax, self.grid_size + 1)
+        x0, y0 = np.meshgrid(x_edges[:-1], y_edges[:-1], indexing="ij")
+        x1, y1 = np.meshgrid(x_edges[1:], y_edges[1:], indexing="ij")
+        cells = shapely.box(x0, y0, x1, y1)
+        codes = np.full(cells.shape, _BOUNDARY, dtype=np.uint8)
+        codes[shapely.contains_properly(self.polygon, cells)] = _INSIDE
+        codes[~shapely.intersects(self.polygon, cells)] = _OUTSIDE
+        return codes
+
+    def _compute_mask(self, x, y):
+        """Determine which points are inside the polygon."""
+        xmin, ymin, xmax, ymax = self.bounds
+        out = np.zeros(len(x), dtype=bool)
+        in_box = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+        box_index = np.flatnonzero(in_box)
+        xb, yb = x[box_index], y[box_index]
+        # Find the raster cell of each point (points on the max edge go in
+        # the last cell).
+        last = self.grid_size - 1
+        width = (xmax - xmin) / self.grid_size or 1.0
+        height = (ymax - ymin) / self.grid_size or 1.0
+        ix = np.minimum(((xb - xmin) / width).astype(np.int64), last)
+        iy = np.minimum(((yb - ymin) / height).astype(np.int64), last)
+        codes = self._cell_codes[ix, iy]
+        out[box_index[codes == _INSIDE]] = True
+        boundary = box_index[codes == _BOUNDARY]
+        out[boundary] = shapely.contains_xy(self.polygon, x[boundary], y[boundary])
+        return out
+
+    def contains_xy(self, x, y):
+        """
+        Return a boolean mask of the points inside the polygon.
+
+        Masks are cached on the content of the coordinate arrays so repeated
+        calls with the same points are free.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        key = _hash_arrays(x, y)
+        if key not in self._mask_cache:
+            if len(self._mask_cache) >= _MAX_CACHED_MASKS:
+                self._mask_cache.pop(next(iter(self._mask_cache)))
+            mask = self._compute_mask(x, y)
+            mask.flags.writeable = False
+            self._mask_cache[key] = mask
+        return self._mask_cache[key]
+
+
+def _hash_arrays(*arrays):
+    """Get a hash of the content of several arrays."""
+    hasher = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        hasher.update(str(array.shape).encode())
+        hasher.update(array.data)
+    return hasher.hexdigest()
+
+
+@cache
+def _get_clipper(polygon_wkb, grid_size):
+    """Get a (cached) clipper for a polygon."""
+    return PolygonClipper(shapely.from_wkb(polygon_wkb), grid_size=grid_size)
+
+
+def get_clipper(polygon, grid_size=64):
+    """Get the cached PolygonClipper for a polygon."""
+    return _get_clipper(shapely.to_wkb(polygon), grid_size)
+
+
+def points_in_polygon(polygon, x, y):
+    """Return a boolean mask of the x, y points inside the polygon."""
+    return get_clipper(polygon).contains_xy(x, y)
+
+
+def clip_events(event_df, polygon, columns=("east", "north")):
+    """
+    Return the events located inside the polygon.
+
+    Parameters
+    ----------
+    event_df
+        The dataframe of events.
+    polygon
+        The polygon, in the same coordinates as columns.
+    columns
+        The names of the x and y columns.
+    """
+    x, y = (event_df[col].values for col in columns)
+    return event_df[points_in_polygon(polygon, x, y)]
+
+
+def clip_points(xyz, polygon):
+    """Return the rows of an (n, 2+) array whose x, y are inside the polygon."""
+    return xyz[points_in_polygon(polygon, xyz[:, 0], xyz[:, 1])]
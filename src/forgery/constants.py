@@ -15,7 +15,20 @@ _CSV_DATA_REGISTRY = {
     "granitoid": data_path / "top_granitoid_vertices.csv",
 }
 
-_SHAPE_FILE_REGISTRY = {"extents": data_path / "FORGE_Extent" / "FORGE_extent.shp"}
+_SHAPE_FILE_REGISTRY = {
+    "extents": data_path / "FORGE_Extent" / "FORGE_extent.shp",
+    "regional_wells": data_path
+    / "Utah_FORGE_regional_wells"
+    / "Utah_FORGE_Regional_wells.shp",
+}
+
+# The regional well attributes to load, and their names once loaded.
+REGIONAL_WELL_COLUMNS = {
+    "HOLE_NAME": "name",
+    "REGION": "region",
+    "Certainty": "certainty",
+    "ELEV___m_": "elevation",
+}
 
 # The number of events that can occur in 24 hours without activating amber
 # level.
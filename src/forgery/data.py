@@ -3,25 +3,45 @@ Module for loading/interacting with data.
 """
 
 import abc
+import importlib.util
 
 import re
+import numpy as np
 import pandas as pd
 import geopandas
-import pint
 from pathlib import Path
 from functools import cache
 
-from forgery.constants import _CSV_DATA_REGISTRY, _SHAPE_FILE_REGISTRY, data_path
+from forgery.constants import (
+    _CSV_DATA_REGISTRY,
+    _SHAPE_FILE_REGISTRY,
+    REGIONAL_WELL_COLUMNS,
+    data_path,
+)
 
 from forgery.events import clean_events
-from forgery.utils import read_first_n_lines_as_text
+from forgery.units import convert
+from forgery.utils import get_distance_from_point, read_first_n_lines_as_text
+
+
+def clean_regional_wells(df):
+    """Rename the regional well attributes and add coordinate columns."""
+    out = df.rename(columns=REGIONAL_WELL_COLUMNS)
+    return out.assign(east=out.geometry.x, north=out.geometry.y)
+
 
 _CLEANING_FUNCTIONS = {
     "events": [clean_events],
+    "regional_wells": [clean_regional_wells],
 }
 
-foot = pint.Unit("ft")
-meter = pint.Unit("m")
+# Only read the needed attributes of the regional wells.
+_SHAPE_FILE_LOAD_KWARGS = {
+    "regional_wells": {"columns": list(REGIONAL_WELL_COLUMNS)},
+}
+
+# Arrow makes pyogrio reads faster but is optional.
+_HAS_ARROW = importlib.util.find_spec("pyarrow") is not None
 
 
 class _DataLoader(abc.ABC):
@@ -30,13 +50,21 @@ class _DataLoader(abc.ABC):
         self._cache = {}
         self._load_kwargs = {} if load_kwargs is None else load_kwargs
 
-    def _load_path(self, path, key):
+    def _load_path(self, path, key, **kwargs):
         clean_funcs = _CLEANING_FUNCTIONS.get(key, [])
-        obj = self.load_func(path)
+        kwargs = {**self._load_kwargs.get(key, {}), **kwargs}
+        obj = self.load_func(path, **kwargs)
         for func in clean_funcs:
             obj = func(obj)
         return obj
 
+    def read(self, key, **kwargs):
+        """Load (without caching) the data of key with extra load kwargs."""
+        value = self.data_registry[key]
+        if isinstance(value, str | Path):
+            return self._load_path(value, key, **kwargs)
+        return {x.name: self._load_path(x, key, **kwargs) for x in value}
+
     def __getitem__(self, key):
         if key not in self._cache:
             value = self.data_registry[key]
@@ -48,27 +76,37 @@ class _DataLoader(abc.ABC):
             self._cache[key] = obj
         return self._cache[key]
 
+    def is_loaded(self, key):
+        """Return True if the data of key have been loaded (and cached)."""
+        return key in self._cache
+
     @abc.abstractmethod
-    def load_func(self, path):
+    def load_func(self, path, **kwargs):
         """Load the data."""
 
 
 class CSVDataLoader(_DataLoader):
     """Simple class to load CSV data."""
 
-    def load_func(self, path):
-        return pd.read_csv(path)
+    def load_func(self, path, **kwargs):
+        return pd.read_csv(path, **kwargs)
 
 
 class ShapeFileLoader(_DataLoader):
-    """Load a shape file."""
+    """
+    Load a shape file.
+
+    Reads go through pyogrio so kwargs such as bbox (row filtering) and
+    columns (attribute projection) are applied while reading.
+    """
 
-    def load_func(self, path):
-        return geopandas.read_file(path)
+    def load_func(self, path, **kwargs):
+        kwargs.setdefault("use_arrow", _HAS_ARROW)
+        return geopandas.read_file(path, engine="pyogrio", **kwargs)
 
 
 csv_data = CSVDataLoader(_CSV_DATA_REGISTRY)
-shp_data = ShapeFileLoader(_SHAPE_FILE_REGISTRY)
+shp_data = ShapeFileLoader(_SHAPE_FILE_REGISTRY, load_kwargs=_SHAPE_FILE_LOAD_KWARGS)
 
 
 def extract_16a_metadata(text):
@@ -101,8 +139,7 @@ def extract_16a_metadata(text):
         if match:
             value, unit_str = match.groups()
             unit_str_clean = clean_unit(unit_str)
-            quantity = float(value) * pint.Quantity(unit_str_clean)
-            return quantity.to(meter)
+            return convert(float(value), unit_str_clean)
         return None
 
     results = {
@@ -143,21 +180,12 @@ def read_16a_survey_data(path=data_path / "well_data" / "16A_survey.csv"):
     df = pd.read_csv(path, skiprows=76, header=None).drop(columns=[0, 16])
     df.columns = columns
 
-    delta_east = (df["delta_east"].values * foot).to(meter)
-    delta_north = (df["delta_north"].values * foot).to(meter)
-    delta_elevation = -(df["vertical_depth"].values * foot).to(meter)
+    cols = ["delta_east", "delta_north", "vertical_depth"]
+    offsets = convert(df[cols].to_numpy(dtype=float, copy=True), "ft", inplace=True)
+    offsets[:, 2] *= -1  # depth to elevation
+    offsets += [info["east"], info["north"], info["kb_elevation"]]
 
-    east = info["east"] + delta_east
-    north = info["north"] + delta_north
-    elevation = info["kb_elevation"] + delta_elevation
-
-    out = pd.DataFrame(
-        {
-            "east": east.magnitude,
-            "north": north.magnitude,
-            "elevation": elevation.magnitude,
-        }
-    )
+    out = pd.DataFrame(offsets, columns=["east", "north", "elevation"])
 
     return out
 
@@ -171,6 +199,7 @@ def extract_16b_metadata(text):
 
     Returns:
     - dict: Extracted values with keys: easting, northing, kb_elev, gl_elev, units, date
+      Lengths are floats in meters.
     """
     patterns = {
         "easting": re.compile(r"WELL EASTING\s*,,:\s*([\d.]+)([a-zA-Z]+)"),
@@ -181,16 +210,13 @@ def extract_16b_metadata(text):
     }
 
     result = {}
-    meter = pint.Quantity("m")
     for key, pattern in patterns.items():
         match = pattern.search(text)
         if match:
             if key == "date":
                 result[key] = pd.to_datetime(match.group(1), format="%m/%d/%Y")
             else:
-                units = pint.Quantity(match.group(2))
-                quant = float(match.group(1)) * units
-                result[key] = quant.to(meter)
+                result[key] = convert(float(match.group(1)), match.group(2))
 
     return result
 
@@ -217,17 +243,10 @@ def read_16b_survey_data(path=data_path / "well_data" / "16B_survey.csv"):
     info = extract_16b_metadata(header_txt)  # noqa
 
     df = pd.read_csv(path, skiprows=24, header=None, names=columns)
-    east = (df["easting"].values * foot).to(meter)
-    north = (df["northing"].values * foot).to(meter)
-    elevation = (df["subsea_true_vertical_depth"].values * foot).to(meter)
-
-    out = pd.DataFrame(
-        {
-            "east": east.magnitude,
-            "north": north.magnitude,
-            "elevation": elevation.magnitude,
-        }
-    )
+    cols = ["easting", "northing", "subsea_true_vertical_depth"]
+    coords = convert(df[cols].to_numpy(dtype=float, copy=True), "ft", inplace=True)
+
+    out = pd.DataFrame(coords, columns=["east", "north", "elevation"])
     return out
 
 
@@ -239,3 +258,49 @@ def get_well_data():
         "16b": read_16b_survey_data(),
     }
     return out
+
+
+def get_site_location():
+    """Get the site location (easting, northing) as the mean wellhead location."""
+    heads = [df[["east", "north"]].values[0] for df in get_well_data().values()]
+    return np.mean(heads, axis=0)
+
+
+@cache
+def _get_regional_wells(max_distance, center):
+    """Read the regional wells within max_distance of center."""
+    x, y = center
+    bbox = (x - max_distance, y - max_distance, x + max_distance, y + max_distance)
+    df = shp_data.read("regional_wells", bbox=bbox)
+    distance = get_distance_from_point(df, center)
+    out = (
+        df.assign(distance=distance)[distance <= max_distance]
+        .sort_values("distance")
+        .reset_index(drop=True)
+    )
+    return out
+
+
+def get_regional_wells(max_distance=10_000, center=None):
+    """
+    Get the regional wells near the site.
+
+    Only the rows in the bounding box of the search radius (and only the
+    needed attributes) are read from the shape file. Results are cached.
+
+    Parameters
+    ----------
+    max_distance
+        The maximum horizontal distance (m) from center.
+    center
+        The (easting, northing) point to measure distance from. If None,
+        use the site location.
+
+    Returns
+    -------
+        A GeoDataFrame of wells sorted by distance, with name, region,
+        certainty, elevation, east, north and distance columns.
+    """
+    center = get_site_location() if center is None else center
+    center = tuple(float(x) for x in np.asarray(center)[:2])
+    return _get_regional_wells(float(max_distance), center)
@@ -0,0 +1,438 @@
+"""
+Export the 3D scene to lightweight web formats.
+
+The scene can be written as binary glTF (.glb) and as a vtk.js scene
+(.vtksz). Meshes sharing a style are merged into a single draw call, and
+the glTF vertex attributes are quantized to 16 (positions) and 8 (normals,
+colors) bit integers using the KHR_mesh_quantization extension.
+"""
+
+import json
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pyvista as pv
+
+# glTF constants.
+_BYTE, _UNSIGNED_BYTE, _SHORT = 5120, 5121, 5122
+_UNSIGNED_SHORT, _UNSIGNED_INT, _FLOAT = 5123, 5125, 5126
+_ARRAY_BUFFER, _ELEMENT_ARRAY_BUFFER = 34962, 34963
+_POINTS, _LINES, _TRIANGLES = 0, 1, 4
+_GLB_MAGIC, _JSON_CHUNK, _BIN_CHUNK = 0x46546C67, 0x4E4F534A, 0x004E4942
+
+# Rotate the z-up scene to the y-up glTF convention (-90 deg about x).
+_Z_UP_TO_Y_UP = [-np.sqrt(0.5), 0.0, 0.0, np.sqrt(0.5)]
+
+
+@dataclass
+class ExportReport:
+    """The outputs of a scene export."""
+
+    paths: dict = field(default_factory=dict)
+    sizes: dict = field(default_factory=dict)
+    build_times: dict = field(default_factory=dict)
+    prepare_time: float = 0.0
+    raw_size: int = 0
+    n_points: int = 0
+    n_cells: int = 0
+
+    def __str__(self):
+        summary = (
+            f"{self.n_points:,} points, {self.n_cells:,} cells "
+            f"({self.raw_size / 1e6:.2f} MB uncompressed)"
+        )
+        lines = [summary, f"prepared in {self.prepare_time:.2f} s"]
+        for name, path in self.paths.items():
+            lines.append(
+                f"{name}: {path} {self.sizes[name] / 1e6:.2f} MB "
+                f"in {self.build_times[name]:.2f} s"
+            )
+        return "\n".join(lines)
+
+
+def _get_mesh_size(mesh):
+    """Get the number of bytes of a mesh's points, cells and point data."""
+    out = mesh.points.nbytes
+    for cells in (mesh.faces, mesh.lines):
+        out += np.asarray(cells).nbytes
+    out += sum(np.asarray(mesh.point_data[x]).nbytes for x in mesh.point_data)
+    return out
+
+
+def _style_key(style):
+    """Get a hashable key of a style for grouping meshes."""
+    return tuple(sorted(style.items()))
+
+
+def prepare_meshes(meshes, decimate=None):
+    """
+    Prepare meshes for export.
+
+    Surfaces are triangulated (and optionally decimated) and meshes with
+    the same style are merged so each style is a single draw call.
+
+    Parameters
+    ----------
+    meshes
+        A dict of {name: (mesh, style)}, see ForgeVistaScene.get_meshes.
+    decimate
+        If not None, the fraction of triangles to remove from surfaces
+        which have no scalars.
+
+    Returns
+    -------
+        A dict of {name: (mesh, style)} with one entry per style.
+    """
+    groups = {}
+    for name, (mesh, style) in meshes.items():
+        mesh = mesh.extract_surface() if not isinstance(mesh, pv.PolyData) else mesh
+        if mesh.faces.size:
+            mesh = mesh.triangulate()
+            if decimate and "scalars" not in style:
+                mesh = mesh.decimate(decimate)
+        names, group = groups.setdefault(_style_key(style), ([], []))
+        names.append(name)
+        group.append(mesh)
+    out = {}
+    for key, (names, group) in groups.items():
+        mesh = group[0] if len(group) == 1 else pv.merge(group)
+        out["_".join(names)] = (mesh, dict(key))
+    return out
+
+
+class _GLBBuilder:
+    """Accumulate glTF json and binary buffer contents."""
+
+    def __init__(self):
+        self.gltf = {
+            "asset": {"version": "2.0", "generator": "forgery"},
+            "scene": 0,
+            "scenes": [{"nodes": [0]}],
+            "nodes": [{"name": "scene", "rotation": _Z_UP_TO_Y_UP, "children": []}],
+            "meshes": [],
+            "materials": [],
+            "accessors": [],
+            "bufferViews": [],
+            "buffers": [],
+        }
+        self._chunks = []
+        self._offset = 0
+        self.quantized = False
+
+    def add_accessor(self, array, component_type, kind, target, normalized=False):
+        """Add an accessor (and its buffer view); return its index."""
+        count = len(array)
+        data = np.ascontiguousarray(array)
+        element_size = data.itemsize * (data.shape[1] if data.ndim > 1 else 1)
+        view = {"buffer": 0, "byteOffset": self._offset, "target": target}
+        if target == _ARRAY_BUFFER and element_size % 4:
+            # Vertex attributes must be aligned to 4 bytes, so pad elements.
+            stride = element_size + (-element_size % 4)
+            padded = np.zeros((count, stride), dtype=np.uint8)
+            padded[:, :element_size] = data.view(np.uint8).reshape(count, -1)
+            data = padded
+            view["byteStride"] = stride
+        raw = data.tobytes()
+        view["byteLength"] = len(raw)
+        self._chunks.append(raw + b"\0" * (-len(raw) % 4))
+        self._offset += len(self._chunks[-1])
+        self.gltf["bufferViews"].append(view)
+        accessor = {
+            "bufferView": len(self.gltf["bufferViews"]) - 1,
+            "componentType": component_type,
+            "count": count,
+            "type": kind,
+        }
+        if normalized:
+            accessor["normalized"] = True
+        if kind == "VEC3" and target == _ARRAY_BUFFER and array.ndim > 1:
+            accessor["min"] = array.min(axis=0).tolist()
+            accessor["max"] = array.max(axis=0).tolist()
+        self.gltf["accessors"].append(accessor)
+        return len(self.gltf["accessors"]) - 1
+
+    def add_material(self, color, opacity):
+        """Add a material; return its index."""
+        rgba = list(pv.Color(color, opacity=opacity).float_rgba)
+        material = {
+            "pbrMetallicRoughness": {
+                "baseColorFactor": rgba,
+                "metallicFactor": 0.0,
+                "roughnessFactor": 1.0,
+            },
+            "doubleSided": True,
+        }
+        if opacity < 1:
+            material["alphaMode"] = "BLEND"
+        self.gltf["materials"].append(material)
+        return len(self.gltf["materials"]) - 1
+
+    def add_node(self, name, mesh_index, translation, scale):
+        """Add a child node of the root for a mesh."""
+        node = {"name": name, "mesh": mesh_index, "translation": list(translation)}
+        if scale is not None:
+            node["scale"] = list(scale)
+        self.gltf["nodes"].append(node)
+        self.gltf["nodes"][0]["children"].append(len(self.gltf["nodes"]) - 1)
+
+    def to_bytes(self):
+        """Get the binary glTF file contents."""
+        binary = b"".join(self._chunks)
+        self.gltf["buffers"] = [{"byteLength": len(binary)}]
+        if self.quantized:
+            extension = ["KHR_mesh_quantization"]
+            self.gltf["extensionsUsed"] = extension
+            self.gltf["extensionsRequired"] = extension
+        text = json.dumps(self.gltf, separators=(",", ":")).encode()
+        text += b" " * (-len(text) % 4)
+        length = 12 + 8 + len(text) + 8 + len(binary)
+        out = struct.pack("<III", _GLB_MAGIC, 2, length)
+        out += struct.pack("<II", len(text), _JSON_CHUNK) + text
+        out += struct.pack("<II", len(binary), _BIN_CHUNK) + binary
+        return out
+
+
+def _get_vertex_colors(mesh, style):
+    """Map the style's scalars through its colormap to rgba bytes."""
+    import matplotlib
+
+    values = np.asarray(mesh.point_data[style["scalars"]], dtype=np.float64)
+    span = np.ptp(values) or 1.0
+    cmap = matplotlib.colormaps[style.get("cmap", "viridis")]
+    return cmap((values - values.min()) / span, bytes=True)
+
+
+def _get_primitive(builder, mesh, style, quantize, center):
+    """Add the attributes and indices of a mesh; return the primitive and scale."""
+    points = mesh.points.astype(np.float64) - center
+    attributes = {}
+    if quantize:
+        # Positions as normalized int16 with the scale moved to the node.
+        scale = np.maximum(np.abs(points).max(axis=0), np.finfo(np.float32).eps)
+        quantized = np.round(points / scale * 32767).astype(np.int16)
+        attributes["POSITION"] = builder.add_accessor(
+            quantized, _SHORT, "VEC3", _ARRAY_BUFFER, normalized=True
+        )
+        builder.quantized = True
+    else:
+        scale = None
+        attributes["POSITION"] = builder.add_accessor(
+            points.astype(np.float32), _FLOAT, "VEC3", _ARRAY_BUFFER
+        )
+
+    if mesh.faces.size:
+        mode = _TRIANGLES
+        indices = mesh.regular_faces.ravel()
+        normals = mesh.point_normals
+        if quantize:
+            # The node scale distorts normals; undo it before quantizing.
+            normals = normals * scale
+            normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+            normals = np.round(normals * 127).astype(np.int8)
+            attributes["NORMAL"] = builder.add_accessor(
+                normals, _BYTE, "VEC3", _ARRAY_BUFFER, normalized=True
+            )
+        else:
+            attributes["NORMAL"] = builder.add_accessor(
+                normals.astype(np.float32), _FLOAT, "VEC3", _ARRAY_BUFFER
+            )
+    elif mesh.lines.size:
+        mode = _LINES
+        indices = _get_line_segments(mesh.lines)
+    else:
+        mode = _POINTS
+        indices = np.arange(mesh.n_points)
+
+    if "scalars" in style:
+        attributes["COLOR_0"] = builder.add_accessor(
+            _get_vertex_colors(mesh, style),
+            _UNSIGNED_BYTE,
+            "VEC4",
+            _ARRAY_BUFFER,
+            normalized=True,
+        )
+
+    index_dtype, index_type = (
+        (np.uint16, _UNSIGNED_SHORT)
+        if mesh.n_points < 2**16
+        else (np.uint32, _UNSIGNED_INT)
+    )
+    primitive = {
+        "attributes": attributes,
+        "indices": builder.add_accessor(
+            indices.astype(index_dtype), index_type, "SCALAR", _ELEMENT_ARRAY_BUFFER
+        ),
+        "mode": mode,
+    }
+    return primitive, scale
+
+
+def _get_line_segments(lines):
+    """Convert vtk polyline connectivity to pairs of segment indices."""
+    lines = np.asarray(lines)
+    out = []
+    position = 0
+    while position < len(lines):
+        n = lines[position]
+        ids = lines[position + 1 : position + 1 + n]
+        out.append(np.stack([ids[:-1], ids[1:]], axis=1).ravel())
+        position += n + 1
+    return np.concatenate(out) if out else np.array([], dtype=np.int64)
+
+
+def write_glb(meshes, path, quantize=True):
+    """
+    Write prepared meshes to a binary glTF file.
+
+    Parameters
+    ----------
+    meshes
+        A dict of {name: (mesh, style)}, see prepare_meshes.
+    path
+        The output path.
+    quantize
+        If True, store positions as int16 and normals/colors as int8 using
+        the KHR_mesh_quantization extension.
+    """
+    builder = _GLBBuilder()
+    # Center the scene on the origin (UTM coordinates are too large for
+    # float32 precision).
+    bounds = np.array([mesh.bounds for mesh, _ in meshes.values()])
+    scene_center = (bounds[:, ::2].min(axis=0) + bounds[:, 1::2].max(axis=0)) / 2
+    for name, (mesh, style) in meshes.items():
+        mesh_center = np.asarray(mesh.center)
+        primitive, scale = _get_primitive(builder, mesh, style, quantize, mesh_center)
+        primitive["material"] = builder.add_material(
+            style.get("color", "white"), style.get("opacity", 1.0)
+        )
+        builder.gltf["meshes"].append({"name": name, "primitives": [primitive]})
+        mesh_index = len(builder.gltf["meshes"]) - 1
+        builder.add_node(name, mesh_index, mesh_center - scene_center, scale)
+    path = Path(path)
+    path.write_bytes(builder.to_bytes())
+    return path
+
+
+def _get_vtksz_exporter(plotter):
+    """
+    Get the object which exports a plotter to vtk.js (vtksz or html).
+
+    From pyvista 0.49 this is the trame plotter component (registered by
+    trame-pyvista); Plotter.export_vtksz and Plotter.export_html only proxy
+    to it with a warning.
+    """
+    if pv.version_info < (0, 49):
+        return plotter
+    component = getattr(plotter, "trame", None)
+    if component is None:
+        msg = (
+            "Exporting to vtksz or html requires the trame plotter component; "
+            "install it with: pip install trame-pyvista"
+        )
+        raise ImportError(msg)
+    return component
+
+
+def check_vtksz_backend():
+    """Raise an ImportError if the vtk.js (vtksz or html) export is unavailable."""
+    pl = pv.Plotter(off_screen=True)
+    try:
+        _get_vtksz_exporter(pl)
+    finally:
+        pl.close()
+
+
+def write_vtksz(meshes, path):
+    """
+    Write prepared meshes to a vtk.js scene.
+
+    Points are centered on the origin and stored as float32.
+    """
+    bounds = np.array([mesh.bounds for mesh, _ in meshes.values()])
+    scene_center = (bounds[:, ::2].min(axis=0) + bounds[:, 1::2].max(axis=0)) / 2
+    pl = pv.Plotter(off_screen=True)
+    try:
+        for mesh, style in meshes.values():
+            mesh = mesh.copy()
+            mesh.points = (mesh.points - scene_center).astype(np.float32)
+            pl.add_mesh(mesh, **style)
+        out = _get_vtksz_exporter(pl).export_vtksz(path)
+    finally:
+        pl.close()
+    return Path(out)
+
+
+_WRITERS = {
+    "glb": lambda meshes, path, quantize: write_glb(meshes, path, quantize),
+    "vtksz": lambda meshes, path, quantize: write_vtksz(meshes, path),
+}
+
+
+def export_scene(
+    scene=None,
+    output_path=Path("_figures"),
+    formats=("glb", "vtksz"),
+    decimate=None,
+    quantize=True,
+    glyph_resolution=8,
+    name="scene_3d",
+):
+    """
+    Export the 3D scene to web formats.
+
+    Parameters
+    ----------
+    scene
+        The ForgeVistaScene to export. If None, use the default scene.
+    output_path
+        The directory in which to write the files.
+    formats
+        The formats to write; any of "glb" and "vtksz".
+    decimate
+        If not None, the fraction of surface triangles to remove.
+    quantize
+        If True, quantize the glTF vertex attributes.
+    glyph_resolution
+        The angular resolution of the event spheres.
+    name
+        The stem of the output files.
+
+    Returns
+    -------
+        An ExportReport of the output paths and sizes, the time to prepare
+        the meshes and the time to write each format.
+
+    Raises
+    ------
+    ImportError
+        If "vtksz" is in formats but its backend (trame-pyvista) is not
+        installed; this is checked before anything is written.
+    """
+    if "vtksz" in formats:
+        check_vtksz_backend()
+    if scene is None:
+        from forgery.vista import ForgeVistaScene
+
+        scene = ForgeVistaScene()
+    output_path = Path(output_path)
+    output_path.mkdir(parents=True, exist_ok=True)
+    report = ExportReport()
+
+    start = time.perf_counter()
+    raw = scene.get_meshes(glyph_resolution=glyph_resolution)
+    report.raw_size = sum(_get_mesh_size(mesh) for mesh, _ in raw.values())
+    meshes = prepare_meshes(raw, decimate=decimate)
+    report.n_points = sum(mesh.n_points for mesh, _ in meshes.values())
+    report.n_cells = sum(mesh.n_cells for mesh, _ in meshes.values())
+    report.prepare_time = time.perf_counter() - start
+
+    for fmt in formats:
+        start = time.perf_counter()
+        path = _WRITERS[fmt](meshes, output_path / f"{name}.{fmt}", quantize)
+        report.paths[fmt] = path
+        report.sizes[fmt] = path.stat().st_size
+        report.build_times[fmt] = time.perf_counter() - start
+    return report
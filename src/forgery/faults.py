@@ -0,0 +1,331 @@
+"""
+Distances from events to the fault surfaces.
+
+The fault vertex clouds are triangulated in their best fitting plane. A
+KD-tree over the vertices finds candidate triangles for each query point,
+then the exact point-triangle distance is computed for the candidates only.
+"""
+
+from functools import cache
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import Delaunay, cKDTree
+
+from forgery.data import csv_data
+from forgery.surface import add_event_elevation
+
+
+def _get_plane_basis(xyz):
+    """
+    Get the centroid and orthonormal basis (u, v, normal) of the best
+    fitting plane. The normal is oriented towards positive easting (or
+    northing for faults striking east-west).
+    """
+    center = xyz.mean(axis=0)
+    _, _, vt = np.linalg.svd(xyz - center, full_matrices=False)
+    normal = vt[2]
+    horizontal = normal[:2]
+    if horizontal[np.argmax(np.abs(horizontal))] < 0:
+        normal = -normal
+    return center, vt[0], vt[1], normal
+
+
+def triangulate_fault(xyz):
+    """
+    Triangulate a fault vertex cloud.
+
+    Faults are near vertical, so the points are projected onto their best
+    fitting plane (rather than the xy plane) before triangulating.
+
+    Returns
+    -------
+        An (n, 3) array of triangle vertex indices.
+    """
+    center, u, v, _ = _get_plane_basis(xyz)
+    local = xyz - center
+    uv = np.stack([local @ u, local @ v], axis=1)
+    return Delaunay(uv).simplices
+
+
+def _dot(a, b):
+    """Row-wise dot product along the last axis."""
+    return np.einsum("...i,...i->...", a, b)
+
+
+def closest_point_on_triangles(p, a, b, c):
+    """
+    Get the closest point on each triangle (a, b, c) to each point p.
+
+    All inputs are (..., 3) arrays which broadcast together. Follows the
+    region based approach of Ericson, Real-Time Collision Detection (5.1.5).
+    """
+    ab, ac = b - a, c - a
+    ap, bp, cp = p - a, p - b, p - c
+    d1, d2 = _dot(ab, ap), _dot(ac, ap)
+    d3, d4 = _dot(ab, bp), _dot(ac, bp)
+    d5, d6 = _dot(ab, cp), _dot(ac, cp)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Start with the face region, then overwrite with the edge and
+        # vertex regions in reverse order of precedence.
+        denom = va + vb + vc
+        v = (vb / denom)[..., None]
+        w = (vc / denom)[..., None]
+        out = a + ab * v + ac * w
+
+        in_bc = (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0)
+        w_bc = ((d4 - d3) / ((d4 - d3) + (d5 - d6)))[..., None]
+        out = np.where(in_bc[..., None], b + (c - b) * w_bc, out)
+
+        in_ac = (vb <= 0) & (d2 >= 0) & (d6 <= 0)
+        w_ac = (d2 / (d2 - d6))[..., None]
+        out = np.where(in_ac[..., None], a + ac * w_ac, out)
+
+        in_c = (d6 >= 0) & (d5 <= d6)
+        out = np.where(in_c[..., None], c, out)
+
+        in_ab = (vc <= 0) & (d1 >= 0) & (d3 <= 0)
+        v_ab = (d1 / (d1 - d3))[..., None]
+        out = np.where(in_ab[..., None], a + ab * v_ab, out)
+
+    in_b = (d3 >= 0) & (d4 <= d3)
+    out = np.where(in_b[..., None], b, out)
+    in_a = (d1 <= 0) & (d2 <= 0)
+    out = np.where(in_a[..., None], a, out)
+    return out
+
+
+class FaultMesh:
+    """
+    A triangulated fault with an acceleration structure for distance queries.
+
+    By default the distance is approximate: candidate triangles for a point
+    are those sharing one of its k nearest vertices, which can miss the
+    nearest triangle of long, thin triangles. The distance is then never
+    underestimated but may be slightly overestimated (for the site faults
+    and catalog by up to about 0.01%, i.e. 0.2 m at 2 km). With exact=True,
+    every triangle whose bounding sphere is within the candidate distance
+    is also tested (using KD-trees over the triangle centroids grouped by
+    sphere radius), which guarantees the nearest triangle is found at a
+    higher cost.
+
+    Parameters
+    ----------
+    xyz
+        An (n, 3) array of fault vertices.
+    k
+        The number of nearest vertices whose triangles are tested.
+    exact
+        If True, guarantee the nearest triangle is found (else the distance
+        may be slightly overestimated).
+    """
+
+    def __init__(self, xyz, k=16, exact=False):
+        self.points = np.asarray(xyz, dtype=np.float64)
+        self.triangles = triangulate_fault(self.points)
+        self.k = min(k, len(self.points))
+        self.exact = exact
+        _, _, _, self.normal = _get_plane_basis(self.points)
+        self.vertex_tree = cKDTree(self.points)
+        self.vertex_triangles = self._get_vertex_triangles()
+        self.triangle_normals = self._get_triangle_normals()
+        self.triangle_trees = self._get_triangle_trees() if exact else []
+
+    def _get_triangle_normals(self):
+        """Get unit triangle normals, oriented to agree with the fault normal."""
+        a, b, c = (self.points[self.triangles[:, i]] for i in range(3))
+        normals = np.cross(b - a, c - a)
+        normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+        flip = normals @ self.normal < 0
+        normals[flip] *= -1
+        return normals
+
+    def _get_vertex_triangles(self):
+        """Get a (n_vertices, max_degree) table of incident triangles, -1 padded."""
+        vertex = self.triangles.ravel()
+        triangle = np.repeat(np.arange(len(self.triangles)), 3)
+        order = np.argsort(vertex, kind="stable")
+        vertex, triangle = vertex[order], triangle[order]
+        counts = np.bincount(vertex, minlength=len(self.points))
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        column = np.arange(len(vertex)) - starts[vertex]
+        out = np.full((len(self.points), max(counts.max(), 1)), -1, dtype=np.int64)
+        out[vertex, column] = triangle
+        return out
+
+    def _get_triangle_trees(self):
+        """
+        Get a list of (tree, max_radius, triangle_index) with triangles
+        grouped by bounding sphere radius (within a factor of 2).
+        """
+        corners = self.points[self.triangles]
+        centroids = corners.mean(axis=1)
+        radius = np.linalg.norm(corners - centroids[:, None, :], axis=-1).max(axis=1)
+        radius = np.maximum(radius, np.finfo(np.float64).tiny)
+        group = np.floor(np.log2(radius / radius.min())).astype(np.int64)
+        out = []
+        for value in np.unique(group):
+            index = np.flatnonzero(group == value)
+            tree = cKDTree(centroids[index])
+            out.append((tree, radius[index].max(), index))
+        return out
+
+    def _get_vertex_candidates(self, xyz):
+        """Get (point, triangle) pairs for triangles on the k nearest vertices."""
+        _, vertices = self.vertex_tree.query(xyz, k=self.k)
+        candidates = self.vertex_triangles[vertices.reshape(len(xyz), -1)]
+        # Neighbouring vertices share triangles; only test each once.
+        candidates = np.sort(candidates.reshape(len(xyz), -1), axis=1)
+        point_index = np.broadcast_to(np.arange(len(xyz))[:, None], candidates.shape)
+        valid = candidates >= 0
+        valid[:, 1:] &= candidates[:, 1:] != candidates[:, :-1]
+        return point_index[valid], candidates[valid]
+
+    def _get_sphere_candidates(self, xyz, upper):
+        """Get (point, triangle) pairs for triangles whose spheres are within upper."""
+        point_index, triangle_index = [], []
+        for tree, radius, index in self.triangle_trees:
+            hits = tree.query_ball_point(xyz, upper + radius, return_sorted=False)
+            lengths = np.fromiter((len(x) for x in hits), np.int64, len(hits))
+            if not lengths.sum():
+                continue
+            point_index.append(np.repeat(np.arange(len(xyz)), lengths))
+            triangle_index.append(index[np.concatenate(hits).astype(np.int64)])
+        return point_index, triangle_index
+
+    def _get_nearest(self, xyz, point_index, triangle_index):
+        """
+        Get the nearest of the candidate triangles for each point.
+
+        Returns
+        -------
+            The distance, triangle index and offset from the closest point
+            on the triangle for each point.
+        """
+        p = xyz[point_index]
+        a, b, c = (self.points[self.triangles[triangle_index, i]] for i in range(3))
+        offset = p - closest_point_on_triangles(p, a, b, c)
+        distance = np.linalg.norm(offset, axis=-1)
+        distance = np.where(np.isfinite(distance), distance, np.inf)
+        # Pairs are grouped by point; take the first minimum of each group.
+        starts = np.flatnonzero(np.diff(point_index, prepend=-1))
+        lengths = np.diff(np.append(starts, len(point_index)))
+        min_distance = np.minimum.reduceat(distance, starts)
+        is_min = np.flatnonzero(distance == np.repeat(min_distance, lengths))
+        best = is_min[np.flatnonzero(np.diff(point_index[is_min], prepend=-1))]
+        return distance[best], triangle_index[best], offset[best]
+
+    def _query_chunk(self, xyz):
+        """Get the distance and side for a chunk of points."""
+        point_index, triangle_index = self._get_vertex_candidates(xyz)
+        distance, triangle, offset = self._get_nearest(xyz, point_index, triangle_index)
+        if self.exact:
+            extra_points, extra_triangles = self._get_sphere_candidates(xyz, distance)
+            point_index = np.concatenate([np.arange(len(xyz))] + extra_points)
+            triangle_index = np.concatenate([triangle] + extra_triangles)
+            order = np.argsort(point_index, kind="stable")
+            point_index, triangle_index = point_index[order], triangle_index[order]
+            distance, triangle, offset = self._get_nearest(
+                xyz, point_index, triangle_index
+            )
+        normals = self.triangle_normals[triangle]
+        side = np.sign(_dot(offset, normals)).astype(np.int8)
+        return distance, side
+
+    def query(self, xyz, chunk_size=50_000):
+        """
+        Get the distance to the fault and the side of the fault for points.
+
+        Parameters
+        ----------
+        xyz
+            An (n, 3) array of points.
+        chunk_size
+            The number of points processed at once (bounds memory use).
+
+        Returns
+        -------
+            The distance (m) to the nearest point on the fault and the side
+            of the fault (+1 in the direction of the fault normal, -1
+            opposite, 0 on the fault).
+        """
+        xyz = np.atleast_2d(np.asarray(xyz, dtype=np.float64))
+        distance = np.empty(len(xyz), dtype=np.float64)
+        side = np.empty(len(xyz), dtype=np.int8)
+        for start in range(0, len(xyz), chunk_size):
+            stop = start + chunk_size
+            distance[start:stop], side[start:stop] = self._query_chunk(xyz[start:stop])
+        return distance, side
+
+
+class FaultProximity:
+    """
+    Compute distances from points to several faults.
+
+    Parameters
+    ----------
+    fault_dfs
+        A dict of {name: dataframe} with x, y, z columns of fault vertices.
+        If None, use the faults in the csv data registry.
+    k
+        The number of nearest vertices whose triangles are tested.
+    exact
+        If True, guarantee the nearest triangle is found.
+    """
+
+    def __init__(self, fault_dfs=None, k=16, exact=False):
+        fault_dfs = csv_data["faults"] if fault_dfs is None else fault_dfs
+        self.faults = {
+            name: FaultMesh(df[["x", "y", "z"]].values, k=k, exact=exact)
+            for name, df in fault_dfs.items()
+        }
+
+    def query(self, xyz):
+        """Get a dict of {name: (distance, side)} for each fault."""
+        return {name: mesh.query(xyz) for name, mesh in self.faults.items()}
+
+    def get_event_distances(
+        self, event_df, columns=("east", "north", "elevation"), grid=None
+    ):
+        """
+        Get the distance and side of each fault for each event.
+
+        Parameters
+        ----------
+        event_df
+            The dataframe of events.
+        columns
+            The coordinate columns of the events.
+        grid
+            If event_df has no elevation column (the catalog only has
+            depth), it is added with add_event_elevation using this
+            SurfaceGrid (if None, the registered land surface).
+
+        Returns
+        -------
+            A dataframe, indexed like event_df, with {fault}_distance and
+            {fault}_side columns. Fault names are the vertex file stems.
+            Events without an elevation have nan distances and side 0.
+        """
+        if "elevation" in columns and "elevation" not in event_df.columns:
+            event_df = add_event_elevation(event_df, grid)
+        xyz = event_df[list(columns)].values
+        finite = np.isfinite(xyz).all(axis=1)
+        out = {}
+        for name, (distance, side) in self.query(xyz[finite]).items():
+            stem = name.split(".")[0]
+            out[f"{stem}_distance"] = np.full(len(xyz), np.nan)
+            out[f"{stem}_distance"][finite] = distance
+            out[f"{stem}_side"] = np.zeros(len(xyz), dtype=np.int8)
+            out[f"{stem}_side"][finite] = side
+        return pd.DataFrame(out, index=event_df.index)
+
+
+@cache
+def get_fault_proximity():
+    """Get the (cached) proximity engine for the registered faults."""
+    return FaultProximity()
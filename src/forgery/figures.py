@@ -0,0 +1,251 @@
+"""
+Pre-rendered figure artifacts for the blog.
+
+Each figure is built in its own process and written to disk. A manifest
+records a hash of each figure's inputs (data files and forgery source) so
+unchanged figures are skipped on subsequent builds.
+"""
+
+import hashlib
+import html
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from forgery.constants import _CSV_DATA_REGISTRY, _SHAPE_FILE_REGISTRY, data_path, here
+
+# The default location of the built figures (relative to the blog).
+FIGURE_PATH = Path("_figures")
+
+_MANIFEST_NAME = "manifest.json"
+
+# The data keys each figure depends on.
+_FIGURE_INPUTS = {
+    "mag_time": {"csv": ["events"], "shp": []},
+    "map_2d": {"csv": ["events"], "shp": ["extents"]},
+    "scene_3d": {
+        "csv": ["events", "surface", "granitoid", "faults"],
+        "shp": ["extents"],
+    },
+}
+
+
+def _configure_chart(chart, width, height, label_font_size):
+    """Apply the blog's chart styling."""
+    out = (
+        chart.properties(
+            width=width,
+            height=height,
+        )
+        .configure_axis(
+            labelFontSize=label_font_size,
+            titleFontSize=label_font_size,
+            labelAngle=0,
+        )
+        .configure_title(
+            fontSize=25,
+        )
+        .configure_legend(
+            labelFontSize=20,
+            titleFontSize=23,
+        )
+    )
+    return out
+
+
+def _write_chart(chart, name, output_path):
+    """Write an altair chart as an html fragment and a vega-lite spec."""
+    html_path = output_path / f"{name}.html"
+    json_path = output_path / f"{name}.json"
+    html_path.write_text(chart.to_html(output_div=name, fullhtml=False))
+    json_path.write_text(chart.to_json())
+    return [html_path, json_path]
+
+
+def build_mag_time(output_path):
+    """Build the magnitude vs time figure."""
+    from forgery.data import csv_data
+    from forgery.plot import plot_event_mag_time
+
+    chart = _configure_chart(
+        plot_event_mag_time(csv_data["events"]),
+        width=550,
+        height=400,
+        label_font_size=18,
+    )
+    return _write_chart(chart, "mag_time", output_path)
+
+
+def build_map_2d(output_path):
+    """Build the 2D event map figure."""
+    from forgery.data import csv_data, get_well_data, shp_data
+    from forgery.plot import plot_map_2d
+
+    permit = shp_data["extents"].iloc[1]["geometry"]
+    chart = _configure_chart(
+        plot_map_2d(csv_data["events"], permit, well_dict=get_well_data()),
+        width=505,
+        height=505,
+        label_font_size=20,
+    )
+    return _write_chart(chart, "map_2d", output_path)
+
+
+def build_scene_3d(output_path):
+    """Build the 3D scene as an html export and a screenshot."""
+    import pyvista as pv
+
+    from forgery.export import _get_vtksz_exporter, check_vtksz_backend
+    from forgery.vista import ForgeVistaScene
+
+    # Fail before the (slow) scene build if the html export is unavailable.
+    check_vtksz_backend()
+    pv.OFF_SCREEN = True
+    html_path = output_path / "scene_3d.html"
+    png_path = output_path / "scene_3d.png"
+    pl = ForgeVistaScene()()
+    try:
+        _get_vtksz_exporter(pl).export_html(html_path)
+        pl.screenshot(png_path)
+    finally:
+        pl.close()
+    return [html_path, png_path]
+
+
+FIGURE_BUILDERS = {
+    "mag_time": build_mag_time,
+    "map_2d": build_map_2d,
+    "scene_3d": build_scene_3d,
+}
+
+
+def _flatten_paths(registry, keys):
+    """Get a flat list of paths from a data registry."""
+    out = []
+    for key in keys:
+        value = registry[key]
+        out.extend([value] if isinstance(value, str | Path) else value)
+    return out
+
+
+def _get_shape_file_parts(path):
+    """Get the .shp file and its sidecars (.dbf, .shx, .prj, ...)."""
+    path = Path(path)
+    return sorted(path.parent.glob(f"{path.stem}.*")) or [path]
+
+
+def get_figure_inputs(name):
+    """Get the paths of all files whose contents determine a figure."""
+    inputs = _FIGURE_INPUTS[name]
+    data_paths = _flatten_paths(_CSV_DATA_REGISTRY, inputs["csv"])
+    for path in _flatten_paths(_SHAPE_FILE_REGISTRY, inputs["shp"]):
+        data_paths += _get_shape_file_parts(path)
+    # Well surveys feed both the map and the scene.
+    if name != "mag_time":
+        data_paths += sorted((data_path / "well_data").glob("*.csv"))
+    source_paths = sorted(here.glob("*.py"))
+    return [Path(x) for x in data_paths] + source_paths
+
+
+def get_figure_hash(name):
+    """Hash the inputs of a figure; a missing input hashes as empty."""
+    hasher = hashlib.sha256(name.encode())
+    for path in get_figure_inputs(name):
+        hasher.update(path.name.encode())
+        if path.exists():
+            hasher.update(path.read_bytes())
+    return hasher.hexdigest()
+
+
+def _read_manifest(output_path):
+    """Read the manifest of previously built figures."""
+    path = Path(output_path) / _MANIFEST_NAME
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def _build_one(name, output_path):
+    """Build a single figure; runs in a worker process."""
+    artifacts = FIGURE_BUILDERS[name](Path(output_path))
+    return [Path(x).name for x in artifacts]
+
+
+def _is_current(entry, figure_hash, output_path):
+    """Return True if a manifest entry matches the hash and artifacts exist."""
+    if entry is None or entry["hash"] != figure_hash:
+        return False
+    return all((output_path / x).exists() for x in entry["artifacts"])
+
+
+def build_figures(output_path=FIGURE_PATH, names=None, force=False, max_workers=None):
+    """
+    Build the blog figures in a process pool.
+
+    Parameters
+    ----------
+    output_path
+        The directory in which to write the artifacts.
+    names
+        The figures to build. If None, build all of them.
+    force
+        If True, rebuild figures even if their inputs are unchanged.
+    max_workers
+        The number of worker processes.
+
+    Returns
+    -------
+        A dict of {figure_name: status} where status is "skipped", "built"
+        or the error raised while building.
+    """
+    output_path = Path(output_path)
+    output_path.mkdir(parents=True, exist_ok=True)
+    names = list(FIGURE_BUILDERS) if names is None else list(names)
+    manifest = _read_manifest(output_path)
+    hashes = {name: get_figure_hash(name) for name in names}
+
+    status = {}
+    to_build = []
+    for name in names:
+        current = _is_current(manifest.get(name), hashes[name], output_path)
+        if current and not force:
+            status[name] = "skipped"
+        else:
+            to_build.append(name)
+
+    if to_build:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                name: executor.submit(_build_one, name, output_path)
+                for name in to_build
+            }
+            for name, future in futures.items():
+                try:
+                    artifacts = future.result()
+                except Exception as e:
+                    manifest.pop(name, None)
+                    status[name] = e
+                    continue
+                manifest[name] = {"hash": hashes[name], "artifacts": artifacts}
+                status[name] = "built"
+
+    manifest_path = output_path / _MANIFEST_NAME
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return status
+
+
+def display_figure(name, output_path=FIGURE_PATH, height=600):
+    """
+    Display a pre-rendered figure in a notebook (or quarto document).
+
+    Charts are embedded directly, the 3D scene is embedded in an iframe.
+    """
+    from IPython.display import HTML
+
+    text = (Path(output_path) / f"{name}.html").read_text()
+    if name == "scene_3d":
+        text = (
+            f'<iframe srcdoc="{html.escape(text)}" width="100%" '
+            f'height="{height}" style="border:none;"></iframe>'
+        )
+    return HTML(text)
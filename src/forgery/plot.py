@@ -16,8 +16,48 @@ from forgery.utils import (
 )
 
 
+def plot_magnitude_stats(stats_df, metric="b_value"):
+    """
+    Make layers of rolling magnitude statistics for the mag-time plot.
+
+    Parameters
+    ----------
+    stats_df
+        The output of forgery.stats.get_rolling_magnitude_stats.
+    metric
+        The statistic plotted on the secondary (right) axis; either
+        "b_value" or "rate".
+
+    Returns
+    -------
+        The magnitude of completeness layer (on the magnitude axis) and the
+        metric layer.
+    """
+    titles = {"b_value": "b-value", "rate": "Rate (events/day)"}
+    base = alt.Chart(stats_df)
+    mc_chart = base.mark_line(strokeWidth=2, strokeDash=[4, 4], color="gray").encode(
+        x="time:T",
+        y=alt.Y("mc:Q", title="Magnitude"),
+        tooltip=["time:T", "mc:Q"],
+    )
+    metric_chart = base.mark_line(strokeWidth=2, color="steelblue").encode(
+        x="time:T",
+        y=alt.Y(
+            f"{metric}:Q",
+            title=titles[metric],
+            axis=alt.Axis(orient="right", titleColor="steelblue"),
+        ),
+        tooltip=["time:T", f"{metric}:Q"],
+    )
+    return mc_chart, metric_chart
+
+
 def plot_event_mag_time(
-    event_df, distance_reference_point=None, buffer=pd.Timedelta(days=0.5)
+    event_df,
+    distance_reference_point=None,
+    buffer=pd.Timedelta(days=0.5),
+    stats_df=None,
+    stats_metric="b_value",
 ):
     """
     Make a magnitude vs time plot.
@@ -29,6 +69,11 @@ def plot_event_mag_time(
     distance_reference_point
         The point (in UTM easting, northing) for determining distances.
         If None, take the median of the events.
+    stats_df
+        If not None, the rolling magnitude statistics (see
+        forgery.stats.get_rolling_magnitude_stats) to add as layers.
+    stats_metric
+        The statistic to plot on the secondary axis.
     """
     if distance_reference_point is None:
         distance_reference_point = get_reference_point_from_df(event_df)
@@ -75,12 +120,25 @@ def plot_event_mag_time(
     )
 
     tjaart = light_charts + events_chart
+    if stats_df is not None:
+        mc_chart, metric_chart = plot_magnitude_stats(stats_df, stats_metric)
+        tjaart = alt.layer(tjaart + mc_chart, metric_chart).resolve_scale(
+            y="independent", size="independent"
+        )
     return tjaart
 
 
-def plot_map_2d(event_df, boundary, well_dict={}, plot_center=None):
+def plot_map_2d(
+    event_df, boundary, well_dict={}, plot_center=None, regional_wells=None
+):
     """
     Make a 2D plot of the events.
+
+    Parameters
+    ----------
+    regional_wells
+        If not None, a dataframe of regional wells (see
+        forgery.data.get_regional_wells) to plot as squares.
     """
     if plot_center is None:
         plot_center = get_reference_point_from_df(event_df)
@@ -105,6 +163,9 @@ def plot_map_2d(event_df, boundary, well_dict={}, plot_center=None):
 
     zoom = alt.selection_interval(bind="scales")
 
+    # Absolute elevations are shown if added (see forgery.surface).
+    tooltip = ["magnitude", "depth", "elevation"]
+
     # Base seismic events points
     points = (
         alt.Chart(event_df)
@@ -118,7 +179,7 @@ def plot_map_2d(event_df, boundary, well_dict={}, plot_center=None):
             size=alt.Size(
                 "magnitude:Q", scale=alt.Scale(range=[10, 200]), title="Magnitude"
             ),
-            tooltip=["magnitude", "depth"],
+            tooltip=[x for x in tooltip if x in event_df.columns],
         )
     )
     charts.append(points)
@@ -144,6 +205,16 @@ def plot_map_2d(event_df, boundary, well_dict={}, plot_center=None):
         )
         charts.append(well_chart)
 
+    # Add regional wells
+    if regional_wells is not None:
+        regional_df = pd.DataFrame(regional_wells.drop(columns="geometry"))
+        regional_chart = (
+            alt.Chart(regional_df)
+            .mark_square(color="black", size=60)
+            .encode(x=alt_x, y=alt_y, tooltip=["name", "region", "distance"])
+        )
+        charts.append(regional_chart)
+
     # # Combine all
     chart = (
         reduce(add, charts)
@@ -0,0 +1,171 @@
+"""
+Rolling magnitude statistics (b-value, magnitude of completeness and rate).
+
+Events are binned into a magnitude histogram per time bucket. The rolling
+window histogram is updated by adding the newest bucket and subtracting the
+oldest, so each update costs O(bins) regardless of the window length.
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# log10(e), the numerator of the Aki max-likelihood b-value estimator.
+_LOG10_E = np.log10(np.e)
+
+# The default time bucket and rolling window durations.
+DEFAULT_BUCKET = pd.Timedelta(hours=1)
+DEFAULT_WINDOW = pd.Timedelta(hours=24)
+
+_STATS_COLUMNS = ["time", "n_events", "rate", "mc", "b_value"]
+
+
+class RollingMagnitudeStats:
+    """
+    Incrementally track magnitude statistics over a rolling window.
+
+    Parameters
+    ----------
+    window_buckets
+        The number of time buckets in the window.
+    bin_width
+        The width of the magnitude bins. Bins are centered on multiples of
+        bin_width.
+    mag_range
+        The (min, max) magnitudes of the histogram; magnitudes outside
+        the range are put into the end bins.
+    mc_correction
+        Added to the maximum curvature estimate of the magnitude of
+        completeness (which tends to underestimate it).
+    min_events
+        The minimum number of events above Mc required to estimate b.
+    """
+
+    def __init__(
+        self,
+        window_buckets,
+        bin_width=0.1,
+        mag_range=(-3.0, 7.0),
+        mc_correction=0.2,
+        min_events=50,
+    ):
+        self.window_buckets = window_buckets
+        self.bin_width = bin_width
+        low, high = (np.round(np.array(mag_range) / bin_width)).astype(np.int64)
+        self.centers = np.arange(low, high + 1) * bin_width
+        self.mc_correction = mc_correction
+        self.min_events = min_events
+        self._buckets = deque()
+        self._hist = np.zeros(len(self.centers), dtype=np.int64)
+
+    def get_bin_index(self, mags):
+        """Get the histogram bin of each magnitude."""
+        index = np.round(np.asarray(mags) / self.bin_width).astype(np.int64)
+        index -= round(self.centers[0] / self.bin_width)
+        return np.clip(index, 0, len(self.centers) - 1)
+
+    def bin_magnitudes(self, mags):
+        """Get the histogram of magnitudes (the counts for one bucket)."""
+        return np.bincount(self.get_bin_index(mags), minlength=len(self.centers))
+
+    def push(self, counts):
+        """Add the histogram of a new bucket, dropping the oldest if full."""
+        counts = np.asarray(counts, dtype=np.int64)
+        self._buckets.append(counts)
+        self._hist += counts
+        if len(self._buckets) > self.window_buckets:
+            self._hist -= self._buckets.popleft()
+        return self
+
+    @property
+    def histogram(self):
+        """The magnitude histogram over the current window."""
+        return self._hist.copy()
+
+    @property
+    def n_events(self):
+        """The number of events in the current window."""
+        return int(self._hist.sum())
+
+    @property
+    def mc(self):
+        """The magnitude of completeness by maximum curvature."""
+        if not self.n_events:
+            return np.nan
+        mc = self.centers[np.argmax(self._hist)] + self.mc_correction
+        return round(mc, 6)
+
+    @property
+    def b_value(self):
+        """The Aki max-likelihood b-value of the events above Mc."""
+        mc = self.mc
+        if np.isnan(mc):
+            return np.nan
+        # Compare bin indices to avoid float issues at the Mc bin.
+        above = np.arange(len(self.centers)) >= np.round(
+            (mc - self.centers[0]) / self.bin_width
+        )
+        counts = self._hist[above]
+        n_above = counts.sum()
+        if n_above < self.min_events:
+            return np.nan
+        mean_mag = (counts * self.centers[above]).sum() / n_above
+        return _LOG10_E / (mean_mag - (mc - self.bin_width / 2))
+
+
+def get_rolling_magnitude_stats(
+    event_df, bucket=DEFAULT_BUCKET, window=DEFAULT_WINDOW, **kwargs
+):
+    """
+    Get the rolling magnitude statistics of an event catalog.
+
+    Parameters
+    ----------
+    event_df
+        The dataframe of events.
+    bucket
+        The duration of each time bucket (the time resolution).
+    window
+        The duration of the rolling window; must be a multiple of bucket.
+    **kwargs
+        Passed to RollingMagnitudeStats.
+
+    Returns
+    -------
+        A dataframe with the time (end of bucket), n_events, rate (events
+        per day), mc and b_value of the window ending at each bucket. It
+        has no rows if event_df is empty.
+    """
+    bucket, window = pd.Timedelta(bucket), pd.Timedelta(window)
+    if bucket <= pd.Timedelta(0) or window < bucket or window % bucket:
+        msg = f"window ({window}) must be a positive multiple of bucket ({bucket})"
+        raise ValueError(msg)
+    window_buckets = window // bucket
+    stats = RollingMagnitudeStats(window_buckets, **kwargs)
+    time = event_df["time"]
+    if time.empty:
+        dtypes = [time.dtype, np.int64, np.float64, np.float64, np.float64]
+        return pd.DataFrame(columns=_STATS_COLUMNS).astype(
+            dict(zip(_STATS_COLUMNS, dtypes))
+        )
+    start = time.min().floor(bucket)
+    bucket_index = ((time - start) // bucket).values.astype(np.int64)
+    n_buckets = bucket_index.max() + 1
+    # Histogram of every bucket at once.
+    bin_index = stats.get_bin_index(event_df["magnitude"].values)
+    counts = np.zeros((n_buckets, len(stats.centers)), dtype=np.int64)
+    np.add.at(counts, (bucket_index, bin_index), 1)
+
+    rows = []
+    for bucket_counts in counts:
+        stats.push(bucket_counts)
+        rows.append((stats.n_events, stats.mc, stats.b_value))
+    out = pd.DataFrame(rows, columns=["n_events", "mc", "b_value"])
+    # The first windows are only partially filled.
+    filled = np.minimum(np.arange(n_buckets) + 1, window_buckets)
+    days = filled * (bucket / pd.Timedelta(days=1))
+    return out.assign(
+        time=start + bucket * (np.arange(n_buckets) + 1),
+        rate=out["n_events"] / days,
+    )[_STATS_COLUMNS]
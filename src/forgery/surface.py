@@ -0,0 +1,101 @@
+"""
+Elevation lookups on the regular surface grids.
+"""
+
+from functools import cache
+
+import numpy as np
+
+from forgery.data import csv_data
+
+
+class SurfaceGrid:
+    """
+    A surface sampled on a regular grid with vectorized bilinear lookup.
+
+    Parameters
+    ----------
+    x, y, z
+        The coordinates of the grid vertices in any order. The x and y
+        coordinates must lie on a regular grid; missing vertices are nan.
+    """
+
+    def __init__(self, x, y, z):
+        x, y, z = (np.asarray(v, dtype=np.float64) for v in (x, y, z))
+        self.x0, self.dx, ix = self._get_axis(x)
+        self.y0, self.dy, iy = self._get_axis(y)
+        self.values = np.full((ix.max() + 1, iy.max() + 1), np.nan)
+        self.values[ix, iy] = z
+
+    @staticmethod
+    def _get_axis(coords):
+        """Get the origin, spacing and integer index of a grid axis."""
+        unique = np.unique(coords)
+        if len(unique) < 2:
+            msg = "A surface grid needs at least two vertices along each axis."
+            raise ValueError(msg)
+        # Use the typical step so one pair of nearly equal coordinates (float
+        # noise) can't give a tiny spacing; every vertex must then lie on a
+        # multiple of it, which bounds the grid size by the vertex extent.
+        spacing = np.median(np.diff(unique))
+        position = (coords - unique[0]) / spacing
+        index = np.round(position).astype(np.int64)
+        if not np.allclose(position, index, rtol=0, atol=1e-6):
+            msg = "Surface vertices are not on a regular grid."
+            raise ValueError(msg)
+        return unique[0], spacing, index
+
+    @classmethod
+    def from_df(cls, df, columns=("x", "y", "z")):
+        """Create the grid from a dataframe of vertices."""
+        return cls(*(df[col].values for col in columns))
+
+    def __call__(self, x, y):
+        """
+        Bilinearly interpolate the surface at the x, y points.
+
+        Points outside the grid (or next to missing vertices) return nan.
+        """
+        fx = (np.asarray(x, dtype=np.float64) - self.x0) / self.dx
+        fy = (np.asarray(y, dtype=np.float64) - self.y0) / self.dy
+        nx, ny = self.values.shape
+        inside = (fx >= 0) & (fx <= nx - 1) & (fy >= 0) & (fy <= ny - 1)
+        # Clip so the cell index is valid; outside points are masked below.
+        ix = np.clip(np.floor(fx).astype(np.int64), 0, nx - 2)
+        iy = np.clip(np.floor(fy).astype(np.int64), 0, ny - 2)
+        tx = np.clip(fx - ix, 0, 1)
+        ty = np.clip(fy - iy, 0, 1)
+        v = self.values
+        out = (
+            v[ix, iy] * (1 - tx) * (1 - ty)
+            + v[ix + 1, iy] * tx * (1 - ty)
+            + v[ix, iy + 1] * (1 - tx) * ty
+            + v[ix + 1, iy + 1] * tx * ty
+        )
+        return np.where(inside, out, np.nan)
+
+
+@cache
+def get_surface_grid(key="surface"):
+    """Get the (cached) surface grid of a csv data registry entry."""
+    return SurfaceGrid.from_df(csv_data[key])
+
+
+def add_event_elevation(event_df, grid=None):
+    """
+    Add the absolute elevation of the events.
+
+    The event depths are relative to the land surface, so the elevation is
+    the surface elevation at the event epicenter minus the depth.
+
+    Parameters
+    ----------
+    event_df
+        The dataframe of events.
+    grid
+        The SurfaceGrid of the land surface. If None, use the registered
+        land surface.
+    """
+    grid = get_surface_grid() if grid is None else grid
+    surface = grid(event_df["east"].values, event_df["north"].values)
+    return event_df.assign(elevation=surface - event_df["depth"].values)
@@ -0,0 +1,97 @@
+"""
+A small unit layer for converting lengths with plain float factors.
+
+Unit strings are resolved to a conversion factor once and cached, then
+applied to plain numpy arrays (in place where possible). Pint is only
+imported for unit strings missing from the table below, or when
+validation is enabled by setting the FORGERY_VALIDATE_UNITS environment
+variable (or forgery.units.VALIDATE_UNITS) to check every factor.
+"""
+
+import os
+from functools import cache
+
+import numpy as np
+
+# Length units in meters.
+_METERS_PER_UNIT = {
+    "m": 1.0,
+    "meter": 1.0,
+    "meters": 1.0,
+    "km": 1_000.0,
+    "cm": 0.01,
+    "mm": 0.001,
+    "ft": 0.3048,
+    "foot": 0.3048,
+    "feet": 0.3048,
+    "in": 0.0254,
+    "inch": 0.0254,
+    "mi": 1_609.344,
+    "mile": 1_609.344,
+}
+
+VALIDATE_UNITS = os.environ.get("FORGERY_VALIDATE_UNITS", "") not in {"", "0"}
+
+
+def _get_pint_factor(unit, to):
+    """Get the conversion factor using pint (slow, imported lazily)."""
+    try:
+        import pint
+    except ImportError:
+        msg = f"Unknown unit conversion {unit} to {to}; install pint to resolve it."
+        raise ValueError(msg) from None
+    return float(pint.Quantity(1.0, unit).to(to).magnitude)
+
+
+@cache
+def _get_table_factor(unit, to):
+    """Get the factor from the table, or with pint for unknown units."""
+    if unit in _METERS_PER_UNIT and to in _METERS_PER_UNIT:
+        return _METERS_PER_UNIT[unit] / _METERS_PER_UNIT[to]
+    return _get_pint_factor(unit, to)
+
+
+def get_conversion_factor(unit, to="m"):
+    """
+    Get the factor which converts values in unit to the to unit.
+
+    Parameters
+    ----------
+    unit
+        The unit string of the values, e.g. "ft".
+    to
+        The unit string to convert to.
+    """
+    unit, to = unit.strip(), to.strip()
+    factor = _get_table_factor(unit, to)
+    if VALIDATE_UNITS:
+        expected = _get_pint_factor(unit, to)
+        if not np.isclose(factor, expected, rtol=1e-12):
+            msg = f"Factor {factor} from {unit} to {to} disagrees with pint."
+            raise ValueError(msg)
+    return factor
+
+
+def convert(values, unit, to="m", inplace=False):
+    """
+    Convert values from unit to the to unit.
+
+    Parameters
+    ----------
+    values
+        A scalar or array of values.
+    unit
+        The unit string of the values.
+    to
+        The unit string to convert to.
+    inplace
+        If True, multiply the (float) array in place rather than making a
+        converted copy.
+    """
+    factor = get_conversion_factor(unit, to)
+    if np.isscalar(values):
+        return float(values) * factor
+    if inplace:
+        values *= factor
+        return values
+    return np.multiply(values, factor, dtype=np.float64)
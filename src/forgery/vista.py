@@ -3,24 +3,53 @@ Utilities for fervo interview code.
 """
 
 from dataclasses import dataclass
+from functools import cached_property
 
 import pyvista as pv
-import shapely
 
-from .data import csv_data, get_well_data, shp_data
+from .clip import clip_points
+from .data import csv_data, get_regional_wells, get_well_data, shp_data
+from .faults import triangulate_fault
+from .surface import SurfaceGrid, add_event_elevation
 
 
 @dataclass
 class ForgeVistaScene:
     """A class for building the Forge model."""
 
-    surface_df = csv_data["surface"]
-    granitoid_df = csv_data["granitoid"]
-    fault_dfs = csv_data["faults"]
-    event_df = csv_data["events"]
-    extents = shp_data["extents"]
-    wells_dfs = get_well_data()
     mag_min = -0.5
+    # If not None, show regional wells within this distance (m) of the site.
+    regional_well_distance = None
+
+    # Data are loaded on first access (rather than import) so the scene can
+    # be created without blocking; see forgery.aio.
+    @property
+    def surface_df(self):
+        return csv_data["surface"]
+
+    @property
+    def granitoid_df(self):
+        return csv_data["granitoid"]
+
+    @property
+    def fault_dfs(self):
+        return csv_data["faults"]
+
+    @property
+    def event_df(self):
+        return csv_data["events"]
+
+    @property
+    def extents(self):
+        return shp_data["extents"]
+
+    @property
+    def wells_dfs(self):
+        return get_well_data()
+
+    @property
+    def regional_wells_df(self):
+        return get_regional_wells(self.regional_well_distance)
 
     def get_plotter(self):
         pl = pv.Plotter()
@@ -29,9 +58,7 @@ class ForgeVistaScene:
 
     def _get_surface(self, xyz, constrain_to_extents=False):
         if constrain_to_extents:
-            poly = self.extents.iloc[0]["geometry"]
-            in_poly = shapely.contains_xy(poly, xyz[:, 0], xyz[:, 1])
-            xyz = xyz[in_poly]
+            xyz = clip_points(xyz, self.extents.iloc[0]["geometry"])
         cloud = pv.PolyData(xyz)
         surface = cloud.delaunay_2d()
         return surface
@@ -45,7 +72,9 @@ class ForgeVistaScene:
         """Add the fault surfaces to the plot."""
         out = {}
         for name, fault in self.fault_dfs.items():
-            out[name] = self._get_surface(fault[["x", "y", "z"]].values)
+            xyz = fault[["x", "y", "z"]].values
+            # Faults are near vertical so can't be triangulated in map view.
+            out[name] = pv.PolyData.from_regular_faces(xyz, triangulate_fault(xyz))
         return out
 
     def get_granitoid(self):
@@ -59,6 +88,20 @@ class ForgeVistaScene:
             lines = df[["east", "north", "elevation"]].values
             plotter.add_lines(lines, connected=True, color="grey")
 
+    def get_regional_wells(self):
+        """Get the regional wellheads as points."""
+        df = self.regional_wells_df
+        return pv.PolyData(df[["east", "north", "elevation"]].values.astype(float))
+
+    def add_regional_wells_to_plotter(self, plotter):
+        """Add the regional wellheads as points."""
+        plotter.add_points(
+            self.get_regional_wells(),
+            color="black",
+            point_size=10,
+            render_points_as_spheres=True,
+        )
+
     def _get_radius(self, mags, max_rad, min_rad):
         """Get the event radii."""
         mag_min, mag_max = mags.min(), mags.max()
@@ -67,29 +110,75 @@ class ForgeVistaScene:
         rad_dist = max_rad - min_rad
         return min_rad + mag_scale * rad_dist
 
-    def add_event_gyphs(self, pl, max_radius=100, min_radius=20):
-        """Plot the event glyphs."""
+    @cached_property
+    def surface_grid(self):
+        """The land surface as a grid for event elevation lookups."""
+        return SurfaceGrid.from_df(self.surface_df)
+
+    def get_event_glyphs(self, max_radius=100, min_radius=20, resolution=16):
+        """
+        Get the event spheres (as a single mesh) sized by magnitude.
+
+        Events outside the land surface grid (or next to missing vertices)
+        have no elevation so are dropped.
+        """
         edf = self.event_df[self.event_df["magnitude"] > self.mag_min]
         # Need to get elevation for events (only depth given)
-        # Use the highest well point.
-        max_el = 0
-        for name, df in self.wells_dfs.items():
-            elev = df["elevation"].values.max()
-            max_el = max([max_el, elev])
-        df = edf.assign(elevation=max_el - edf["depth"])
+        df = add_event_elevation(edf, self.surface_grid)
+        df = df[df["elevation"].notna()]
 
         # Get radii of events.
-        mags = edf["magnitude"].values
+        mags = df["magnitude"].values
         radii = self._get_radius(mags, max_radius, min_radius)
 
         poly = pv.PolyData(df[["east", "north", "elevation"]].values)
         poly["magnitude"] = mags
         poly["radius"] = radii
 
-        smooth_sphere = pv.Sphere(radius=1.0, theta_resolution=16, phi_resolution=16)
+        smooth_sphere = pv.Sphere(
+            radius=1.0, theta_resolution=resolution, phi_resolution=resolution
+        )
 
         glyphs = poly.glyph(geom=smooth_sphere, factor=1.0, scale="radius")
         glyphs.active_scalars_name = "magnitude"
+        return glyphs
+
+    def get_wells(self):
+        """Get the wells as a single polyline mesh."""
+        lines = [
+            pv.lines_from_points(df[["east", "north", "elevation"]].values)
+            for df in self.wells_dfs.values()
+        ]
+        return pv.merge(lines)
+
+    def get_meshes(self, glyph_resolution=16):
+        """
+        Get the meshes of the scene and how they are styled.
+
+        Returns
+        -------
+            A dict of {name: (mesh, style)} where style is a dict of
+            color, opacity and (optionally) scalars and cmap.
+        """
+        glyphs = self.get_event_glyphs(resolution=glyph_resolution)
+        out = {
+            "surface": (self.get_surface(), {"color": "lightblue", "opacity": 0.25}),
+            "granitoid": (self.get_granitoid(), {"color": "red", "opacity": 0.15}),
+            "wells": (self.get_wells(), {"color": "grey", "opacity": 1.0}),
+            "events": (
+                glyphs,
+                {"scalars": "magnitude", "cmap": "viridis", "opacity": 1.0},
+            ),
+        }
+        if self.regional_well_distance is not None:
+            style = {"color": "black", "opacity": 1.0}
+            out["regional_wells"] = (self.get_regional_wells(), style)
+        return out
+
+    def add_event_gyphs(self, pl, max_radius=100, min_radius=20):
+        """Plot the event glyphs."""
+        glyphs = self.get_event_glyphs(max_radius=max_radius, min_radius=min_radius)
+        mags = glyphs["magnitude"]
 
         pl.add_mesh(
             glyphs,
@@ -105,15 +194,31 @@ class ForgeVistaScene:
 
         return glyphs
 
-    def __call__(self):
+    def iter_build(self):
+        """
+        Build the plotter in steps, yielding between them.
+
+        This lets a caller (see forgery.aio.build_scene) stop the build
+        early by closing the generator; the plotter is the return value.
+        """
         pl = self.get_plotter()
-        surface = self.get_surface()
-        granitoid = self.get_granitoid()
-        pl.add_mesh(surface, opacity=0.25)
-        pl.add_mesh(granitoid, color="red", opacity=0.15)
-        self.add_wells_to_plotter(pl)
-        glyphs = self.add_event_gyphs(pl)
-        pl.add_mesh(glyphs)
+        try:
+            yield
+            surface = self.get_surface()
+            yield
+            granitoid = self.get_granitoid()
+            yield
+            pl.add_mesh(surface, opacity=0.25)
+            pl.add_mesh(granitoid, color="red", opacity=0.15)
+            self.add_wells_to_plotter(pl)
+            if self.regional_well_distance is not None:
+                self.add_regional_wells_to_plotter(pl)
+            yield
+            glyphs = self.add_event_gyphs(pl)
+            pl.add_mesh(glyphs)
+        except GeneratorExit:
+            pl.close()
+            raise
         # pl.show_bounds(
         #     grid='front', location='outer', all_edges=True,
         #     xtitle='', ytitle='', ztitle='',  # Remove axis labels
@@ -125,3 +230,11 @@ class ForgeVistaScene:
         axes.SetYAxisLabelText("North")
         axes.SetZAxisLabelText("Z")
         return pl
+
+    def __call__(self):
+        steps = self.iter_build()
+        while True:
+            try:
+                next(steps)
+            except StopIteration as e:
+                return e.value
@@ -0,0 +1,140 @@
+"""
+Tests for the async data loading api.
+"""
+
+import asyncio
+import threading
+
+import pandas as pd
+import pytest
+
+import forgery.aio
+from forgery.aio import build_scene, load
+from forgery.data import csv_data
+
+
+class _StubScene:
+    """A scene which records its build steps instead of plotting."""
+
+    def __init__(self, step_event=None):
+        self.steps = []
+        self.closed = False
+        self.step_event = step_event
+
+    def iter_build(self):
+        try:
+            for step in range(3):
+                self.steps.append(step)
+                if self.step_event is not None:
+                    self.step_event.wait(5)
+                yield
+        except GeneratorExit:
+            self.closed = True
+            raise
+        return "plotter"
+
+
+class TestLoad:
+    """Tests for loading data asynchronously."""
+
+    @pytest.fixture()
+    def empty_cache(self, monkeypatch):
+        """Ensure the csv data have not yet been loaded."""
+        monkeypatch.setattr(csv_data, "_cache", {})
+
+    def test_load_events(self, empty_cache):
+        """Ensure the events can be loaded."""
+        df = asyncio.run(load("events"))
+        assert isinstance(df, pd.DataFrame)
+        assert df is csv_data["events"]
+
+    def test_concurrent_loads_shared(self, empty_cache):
+        """Concurrent loads of the same key should return the same object."""
+
+        async def _load_many():
+            return await asyncio.gather(*[load("events") for _ in range(5)])
+
+        out = asyncio.run(_load_many())
+        assert all(x is out[0] for x in out)
+
+    def test_cancel_one_waiter(self, empty_cache):
+        """Cancelling one waiter should not cancel the shared load."""
+
+        async def _cancel_one():
+            first = asyncio.create_task(load("events"))
+            second = asyncio.create_task(load("events"))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        assert isinstance(asyncio.run(_cancel_one()), pd.DataFrame)
+
+    def test_bad_key(self):
+        """An unregistered key should raise."""
+        with pytest.raises(KeyError, match="No data registered"):
+            asyncio.run(load("not_a_key"))
+
+
+class TestBuildScene:
+    """Tests for building the scene asynchronously."""
+
+    @pytest.fixture()
+    def release_loads(self, monkeypatch):
+        """Make every load block until the returned event is set."""
+        release = threading.Event()
+        monkeypatch.setattr(csv_data, "_cache", {})
+        monkeypatch.setattr(
+            forgery.aio, "_get_load_func", lambda key: lambda: release.wait(5)
+        )
+        yield release
+        release.set()
+
+    def test_returns_plotter(self, release_loads):
+        """The scene should be built after the data are loaded."""
+        release_loads.set()
+        scene = _StubScene()
+        assert asyncio.run(build_scene(scene=scene)) == "plotter"
+        assert scene.steps == [0, 1, 2]
+
+    def test_cancel_during_loads(self, release_loads):
+        """Cancelling while loads are in flight should not build the scene."""
+        scene = _StubScene()
+
+        async def _cancel():
+            task = asyncio.create_task(build_scene(scene=scene))
+            await asyncio.sleep(0.05)
+            assert not task.done()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            # The in-flight loads no longer have waiters.
+            assert all(x[1] == 0 for x in forgery.aio._IN_FLIGHT.values())
+
+        asyncio.run(_cancel())
+        assert scene.steps == []
+
+    def test_cancel_during_build(self, release_loads):
+        """Cancelling during construction should stop after the current step."""
+        release_loads.set()
+        step_event = threading.Event()
+        scene = _StubScene(step_event=step_event)
+
+        async def _cancel():
+            task = asyncio.create_task(build_scene(scene=scene))
+            while not scene.steps:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            step_event.set()
+
+        asyncio.run(_cancel())
+        # Give the worker thread time to notice the cancellation.
+        for _ in range(100):
+            if scene.closed:
+                break
+            threading.Event().wait(0.01)
+        assert scene.closed
+        assert scene.steps == [0]
@@ -0,0 +1,58 @@
+"""
+Tests for clipping points to polygons.
+"""
+
+import numpy as np
+import pytest
+import shapely
+
+from forgery.clip import PolygonClipper, clip_events, get_clipper
+from forgery.data import csv_data, shp_data
+
+
+class TestPolygonClipper:
+    """Tests for the point in polygon test."""
+
+    @pytest.fixture(scope="class")
+    def extent(self):
+        """The FORGE extent polygon."""
+        return shp_data["extents"].iloc[0]["geometry"]
+
+    @pytest.fixture(scope="class")
+    def points(self, extent):
+        """Random points in and around the extent."""
+        xmin, ymin, xmax, ymax = extent.buffer(1_000).bounds
+        rng = np.random.default_rng(42)
+        x = rng.uniform(xmin, xmax, 50_000)
+        y = rng.uniform(ymin, ymax, 50_000)
+        return x, y
+
+    def test_matches_shapely(self, extent, points):
+        """The mask should match the exact shapely test."""
+        x, y = points
+        expected = shapely.contains_xy(extent, x, y)
+        out = PolygonClipper(extent).contains_xy(x, y)
+        assert expected.any() and not expected.all()
+        assert np.array_equal(out, expected)
+
+    def test_concave_polygon(self):
+        """Concave polygons should be handled by the boundary cells."""
+        poly = shapely.Polygon([(0, 0), (10, 0), (10, 10), (5, 2), (0, 10)])
+        x, y = np.meshgrid(np.linspace(-1, 11, 97), np.linspace(-1, 11, 97))
+        x, y = x.ravel(), y.ravel()
+        out = PolygonClipper(poly, grid_size=8).contains_xy(x, y)
+        assert np.array_equal(out, shapely.contains_xy(poly, x, y))
+
+    def test_mask_cached(self, extent, points):
+        """Repeated calls with the same points return the cached mask."""
+        clipper = get_clipper(extent)
+        assert clipper is get_clipper(extent)
+        first = clipper.contains_xy(*points)
+        assert clipper.contains_xy(*points) is first
+
+    def test_clip_events(self, extent):
+        """Ensure events can be clipped to the extent."""
+        df = csv_data["events"]
+        out = clip_events(df, extent)
+        expected = shapely.contains_xy(extent, df["east"], df["north"])
+        assert len(out) == expected.sum()
@@ -5,7 +5,13 @@ Tests for data functions.
 import pandas as pd
 import pytest
 
-from forgery.data import read_16a_survey_data, read_16b_survey_data
+from forgery.data import (
+    csv_data,
+    get_regional_wells,
+    read_16a_survey_data,
+    read_16b_survey_data,
+    shp_data,
+)
 
 
 class TestReadSurveyData:
@@ -31,3 +37,40 @@ class TestReadSurveyData:
         required_cols = {"east", "north", "elevation"}
         assert isinstance(well_df, pd.DataFrame)
         assert set(well_df.columns).issuperset(required_cols)
+
+
+class TestRegionalWells:
+    """Tests for loading the regional wells."""
+
+    @pytest.fixture(scope="class")
+    def regional_wells(self):
+        """The regional wells within 3 km of the site."""
+        return get_regional_wells(3_000)
+
+    def test_registered(self):
+        """The full shapefile is registered with only the needed columns."""
+        df = shp_data["regional_wells"]
+        assert len(df) == 101
+        assert {"name", "elevation", "east", "north"}.issubset(df.columns)
+        assert "COUNTY" not in df.columns
+
+    def test_filtered_by_distance(self, regional_wells):
+        """Only wells within the distance are returned, sorted by distance."""
+        assert 0 < len(regional_wells) < len(shp_data["regional_wells"])
+        assert (regional_wells["distance"] <= 3_000).all()
+        assert regional_wells["distance"].is_monotonic_increasing
+
+    def test_cached(self, regional_wells):
+        """Repeated lookups return the cached result."""
+        assert get_regional_wells(3_000) is regional_wells
+
+
+class TestDataLoader:
+    """Tests for the cached data loaders."""
+
+    def test_is_loaded(self, monkeypatch):
+        """is_loaded should only be True once the data are read."""
+        monkeypatch.setattr(csv_data, "_cache", {})
+        assert not csv_data.is_loaded("events")
+        csv_data["events"]
+        assert csv_data.is_loaded("events")
@@ -0,0 +1,185 @@
+"""
+Tests for exporting the 3D scene.
+"""
+
+import json
+import struct
+import warnings
+
+import numpy as np
+import pytest
+import pyvista as pv
+
+import forgery.export
+from forgery.cli import main
+from forgery.export import check_vtksz_backend, export_scene, prepare_meshes
+
+
+def _has_vtksz_backend():
+    """Return True if the scene can be exported to vtksz here."""
+    try:
+        check_vtksz_backend()
+    except ImportError:
+        return False
+    return True
+
+
+class _SimpleScene:
+    """A small stand-in for ForgeVistaScene (in UTM-like coordinates)."""
+
+    origin = np.array([335_000.0, 4_263_000.0, 1_500.0])
+
+    def get_meshes(self, glyph_resolution=8):
+        surface = pv.Plane(
+            center=self.origin, i_size=2_000, j_size=2_000, i_resolution=40
+        )
+        granitoid = surface.translate((0, 0, -2_000))
+        events = pv.PolyData(
+            self.origin + np.random.default_rng(0).normal(0, 200, (50, 3))
+        )
+        events["magnitude"] = np.linspace(-1, 2, 50)
+        glyphs = events.glyph(
+            geom=pv.Sphere(
+                theta_resolution=glyph_resolution, phi_resolution=glyph_resolution
+            ),
+            scale=False,
+            factor=20,
+        )
+        wells = pv.merge(
+            [
+                pv.lines_from_points(
+                    self.origin + [[0, 0, 0], [0, 0, -1000], [50, 0, -2000]]
+                ),
+                pv.lines_from_points(self.origin + [[10, 0, 0], [10, 0, -2000]]),
+            ]
+        )
+        return {
+            "surface": (surface, {"color": "lightblue", "opacity": 0.25}),
+            "granitoid": (granitoid, {"color": "red", "opacity": 0.15}),
+            "wells": (wells, {"color": "grey", "opacity": 1.0}),
+            "events": (
+                glyphs,
+                {"scalars": "magnitude", "cmap": "viridis", "opacity": 1.0},
+            ),
+        }
+
+
+def _read_glb(path):
+    """Read the json and binary chunks of a glb file."""
+    data = path.read_bytes()
+    magic, version, length = struct.unpack("<III", data[:12])
+    assert magic == 0x46546C67 and version == 2 and length == len(data)
+    json_length = struct.unpack("<I", data[12:16])[0]
+    gltf = json.loads(data[20 : 20 + json_length])
+    binary = data[20 + json_length + 8 :]
+    return gltf, binary
+
+
+def _read_positions(gltf, binary, node):
+    """Decode the (quantized) positions of a node's mesh to scene coordinates."""
+    primitive = gltf["meshes"][node["mesh"]]["primitives"][0]
+    accessor = gltf["accessors"][primitive["attributes"]["POSITION"]]
+    view = gltf["bufferViews"][accessor["bufferView"]]
+    dtype = {5122: np.int16, 5126: np.float32}[accessor["componentType"]]
+    stride = view.get("byteStride", 3 * np.dtype(dtype).itemsize)
+    raw = np.frombuffer(
+        binary, np.uint8, view["byteLength"], view["byteOffset"]
+    ).reshape(accessor["count"], stride)
+    out = raw[:, : 3 * np.dtype(dtype).itemsize].copy().view(dtype).astype(float)
+    if accessor.get("normalized"):
+        out /= 32767
+    return out * node.get("scale", 1) + node["translation"]
+
+
+class TestExportScene:
+    """Tests for writing the scene to glTF."""
+
+    @pytest.fixture(scope="class", params=[True, False])
+    def report(self, request, tmp_path_factory):
+        """Export the simple scene."""
+        path = tmp_path_factory.mktemp("export")
+        return export_scene(
+            _SimpleScene(), path, formats=("glb",), quantize=request.param
+        )
+
+    def test_report(self, report):
+        """Ensure the report has sizes and times."""
+        assert report.paths["glb"].exists()
+        assert report.sizes["glb"] == report.paths["glb"].stat().st_size
+        assert report.build_times["glb"] > 0
+        assert report.prepare_time > 0
+        assert "glb" in str(report)
+        assert "prepared in" in str(report)
+
+    def test_glb_positions(self, report):
+        """The decoded positions should match the (centered) meshes."""
+        gltf, binary = _read_glb(report.paths["glb"])
+        meshes = prepare_meshes(_SimpleScene().get_meshes())
+        bounds = np.array([mesh.bounds for mesh, _ in meshes.values()])
+        center = (bounds[:, ::2].min(axis=0) + bounds[:, 1::2].max(axis=0)) / 2
+        nodes = {x["name"]: x for x in gltf["nodes"][1:]}
+        for name, (mesh, _) in meshes.items():
+            decoded = _read_positions(gltf, binary, nodes[name])
+            # int16 over a ~2 km extent is accurate to a few cm.
+            assert np.allclose(decoded, mesh.points - center, atol=0.1)
+
+    def test_merged_draw_calls(self, report):
+        """One mesh (draw call) per style."""
+        gltf, _ = _read_glb(report.paths["glb"])
+        assert len(gltf["meshes"]) == 4
+        modes = {x["name"]: x["primitives"][0]["mode"] for x in gltf["meshes"]}
+        assert modes["wells"] == 1 and modes["events"] == 4
+
+
+class TestExportVtksz:
+    """Tests for writing the scene to vtk.js."""
+
+    @pytest.fixture()
+    def missing_backend(self, monkeypatch):
+        """Make the vtksz backend appear to be missing."""
+
+        def _raise(plotter):
+            raise ImportError("install trame-pyvista")
+
+        monkeypatch.setattr(forgery.export, "_get_vtksz_exporter", _raise)
+
+    @pytest.mark.skipif(
+        not _has_vtksz_backend(), reason="vtksz export needs trame-pyvista"
+    )
+    def test_default_formats(self, tmp_path):
+        """Both default formats should be written without warnings."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", pv.core.errors.PyVistaDeprecationWarning)
+            report = export_scene(_SimpleScene(), tmp_path)
+        assert set(report.paths) == {"glb", "vtksz"}
+        assert report.paths["vtksz"].stat().st_size > 0
+
+    def test_missing_backend(self, tmp_path, missing_backend):
+        """Nothing is written if the vtksz backend is missing."""
+        with pytest.raises(ImportError, match="trame-pyvista"):
+            export_scene(_SimpleScene(), tmp_path)
+        assert not list(tmp_path.iterdir())
+
+    def test_cli_missing_backend(self, tmp_path, missing_backend, capsys):
+        """The command line reports the missing backend with an exit code."""
+        assert main(["export-scene", "-o", str(tmp_path)]) == 1
+        assert "trame-pyvista" in capsys.readouterr().err
+
+
+class TestPrepareMeshes:
+    """Tests for merging and decimating meshes."""
+
+    def test_merge_same_style(self):
+        """Meshes with the same style should be merged."""
+        meshes = _SimpleScene().get_meshes()
+        meshes["granitoid"] = (meshes["granitoid"][0], meshes["surface"][1])
+        out = prepare_meshes(meshes)
+        assert "surface_granitoid" in out and len(out) == 3
+
+    def test_decimate(self):
+        """Decimation should reduce the surface triangle count."""
+        meshes = _SimpleScene().get_meshes()
+        full = prepare_meshes(meshes)
+        decimated = prepare_meshes(meshes, decimate=0.5)
+        assert decimated["surface"][0].n_cells < full["surface"][0].n_cells
+        assert decimated["events"][0].n_cells == full["events"][0].n_cells
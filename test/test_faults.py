@@ -0,0 +1,120 @@
+"""
+Tests for the fault proximity engine.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forgery.data import csv_data
+from forgery.faults import (
+    FaultMesh,
+    FaultProximity,
+    closest_point_on_triangles,
+    get_fault_proximity,
+)
+from forgery.surface import add_event_elevation, get_surface_grid
+
+
+def _brute_force_distance(mesh, xyz):
+    """Get the distance to every triangle of the mesh for each point."""
+    tri = mesh.triangles
+    a, b, c = (mesh.points[tri[:, i]][None, :, :] for i in range(3))
+    closest = closest_point_on_triangles(xyz[:, None, :], a, b, c)
+    return np.linalg.norm(xyz[:, None, :] - closest, axis=-1).min(axis=1)
+
+
+class TestClosestPoint:
+    """Tests for the point triangle closest point function."""
+
+    @pytest.fixture()
+    def triangle(self):
+        """A simple triangle in the xy plane."""
+        return np.array([0.0, 0, 0]), np.array([1.0, 0, 0]), np.array([0.0, 1, 0])
+
+    @pytest.mark.parametrize(
+        "point, expected",
+        [
+            ((0.2, 0.2, 5), (0.2, 0.2, 0)),  # face
+            ((-1, -1, 0), (0, 0, 0)),  # vertex a
+            ((3, -1, 0), (1, 0, 0)),  # vertex b
+            ((-1, 3, 0), (0, 1, 0)),  # vertex c
+            ((0.5, -2, 1), (0.5, 0, 0)),  # edge ab
+            ((-2, 0.5, 0), (0, 0.5, 0)),  # edge ac
+            ((1, 1, 0), (0.5, 0.5, 0)),  # edge bc
+        ],
+    )
+    def test_regions(self, triangle, point, expected):
+        """Ensure each voronoi region of the triangle is handled."""
+        out = closest_point_on_triangles(np.array(point, dtype=float), *triangle)
+        assert np.allclose(out, expected)
+
+
+class TestFaultProximity:
+    """Tests for distances to the fault surfaces."""
+
+    @pytest.fixture(scope="class")
+    def proximity(self):
+        """The default fault proximity engine."""
+        return get_fault_proximity()
+
+    @pytest.fixture(scope="class")
+    def event_df(self):
+        """Events with an (approximate) elevation."""
+        df = csv_data["events"]
+        return df.assign(elevation=1_700 - df["depth"])
+
+    def test_event_distances(self, proximity, event_df):
+        """Ensure each fault gets a distance and side column."""
+        out = proximity.get_event_distances(event_df)
+        assert isinstance(out, pd.DataFrame)
+        assert out.index.equals(event_df.index)
+        for name in proximity.faults:
+            stem = name.split(".")[0]
+            assert (out[f"{stem}_distance"] >= 0).all()
+            assert set(out[f"{stem}_side"].unique()).issubset({-1, 0, 1})
+
+    def test_elevation_added(self, proximity):
+        """Events with only depth get their elevation from the surface grid."""
+        # The land surface vertices aren't in the repo; use the granitoid.
+        grid = get_surface_grid("granitoid")
+        df = csv_data["events"].iloc[::50].copy()
+        df.loc[df.index[0], "east"] = -1e9  # off the grid
+        out = proximity.get_event_distances(df, grid=grid)
+        expected = proximity.get_event_distances(add_event_elevation(df, grid))
+        pd.testing.assert_frame_equal(out, expected)
+        distance_columns = [x for x in out.columns if x.endswith("_distance")]
+        assert out.iloc[0][distance_columns].isna().all()
+        assert out.iloc[1:][distance_columns].notna().all().all()
+
+    def test_matches_brute_force(self, proximity, event_df):
+        """
+        The approximate distance should never be less than testing all
+        triangles and at most 0.01% more (as documented in FaultMesh).
+        """
+        xyz = event_df[["east", "north", "elevation"]].values
+        for mesh in proximity.faults.values():
+            distance, _ = mesh.query(xyz)
+            expected = np.concatenate(
+                [_brute_force_distance(mesh, x) for x in np.array_split(xyz, 10)]
+            )
+            assert np.all(distance >= expected - 1e-9)
+            assert np.all(distance <= expected * (1 + 1e-4))
+
+    def test_exact_matches_brute_force(self, event_df):
+        """In exact mode the distances should match testing all triangles."""
+        proximity = FaultProximity(exact=True)
+        xyz = event_df[["east", "north", "elevation"]].values[::20]
+        for mesh in proximity.faults.values():
+            distance, _ = mesh.query(xyz, chunk_size=17)
+            assert np.allclose(distance, _brute_force_distance(mesh, xyz))
+
+    def test_side_of_plane(self):
+        """Points on either side of a planar fault get opposite signs."""
+        y, z = np.meshgrid(np.linspace(0, 100, 11), np.linspace(-50, 50, 11))
+        xyz = np.stack([np.zeros(y.size), y.ravel(), z.ravel()], axis=1)
+        mesh = FaultMesh(xyz)
+        points = np.array([[10.0, 50, 0], [-10.0, 50, 0]])
+        distance, side = mesh.query(points, chunk_size=1)
+        assert np.allclose(distance, 10)
+        assert list(side) == [1, -1]
@@ -0,0 +1,107 @@
+"""
+Tests for building the blog figures.
+"""
+
+import json
+
+import pytest
+import pyvista as pv
+
+import forgery.export
+import forgery.vista
+from forgery.cli import main
+from forgery.export import check_vtksz_backend
+from forgery.figures import build_figures, get_figure_hash, get_figure_inputs
+
+
+def _has_html_backend():
+    """Return True if the scene can be exported to html here."""
+    try:
+        check_vtksz_backend()
+    except ImportError:
+        return False
+    return True
+
+
+class _StubScene:
+    """A small stand-in for ForgeVistaScene (the land surface is missing)."""
+
+    def __call__(self):
+        pl = pv.Plotter(off_screen=True)
+        pl.add_mesh(pv.Sphere())
+        return pl
+
+
+class TestBuildFigures:
+    """Tests for the pre-rendered figure pipeline."""
+
+    @pytest.fixture(scope="class")
+    def figure_path(self, tmp_path_factory):
+        """Build the charts into a temporary directory."""
+        path = tmp_path_factory.mktemp("figures")
+        status = build_figures(path, names=["mag_time", "map_2d"], max_workers=2)
+        assert status == {"mag_time": "built", "map_2d": "built"}
+        return path
+
+    def test_artifacts_written(self, figure_path):
+        """Ensure the artifacts and manifest exist."""
+        manifest = json.loads((figure_path / "manifest.json").read_text())
+        assert set(manifest) == {"mag_time", "map_2d"}
+        for entry in manifest.values():
+            for artifact in entry["artifacts"]:
+                assert (figure_path / artifact).exists()
+
+    def test_unchanged_figures_skipped(self, figure_path):
+        """A second build should not rebuild anything."""
+        status = build_figures(figure_path, names=["mag_time", "map_2d"])
+        assert set(status.values()) == {"skipped"}
+
+    def test_hash_stable(self):
+        """The input hash should be deterministic and figure specific."""
+        assert get_figure_hash("mag_time") == get_figure_hash("mag_time")
+        assert get_figure_hash("mag_time") != get_figure_hash("map_2d")
+
+    def test_cli(self, figure_path, capsys):
+        """The command line entry point reports skipped figures."""
+        assert main(["build-figures", "mag_time", "-o", str(figure_path)]) == 0
+        assert "mag_time: skipped" in capsys.readouterr().out
+
+    def test_shape_file_sidecars_hashed(self):
+        """The attribute and index files of shape files are figure inputs."""
+        names = {x.name for x in get_figure_inputs("map_2d")}
+        assert {"FORGE_extent.shp", "FORGE_extent.dbf", "FORGE_extent.shx"} <= names
+
+
+class TestBuildScene3D:
+    """Tests for the pre-rendered 3D scene (built with a stub scene)."""
+
+    @pytest.fixture()
+    def stub_scene(self, monkeypatch):
+        """Build a small scene instead of the forge scene."""
+        # The build workers are forked, so they inherit the patch.
+        monkeypatch.setattr(forgery.vista, "ForgeVistaScene", _StubScene)
+
+    @pytest.mark.skipif(
+        not _has_html_backend(), reason="html export needs trame-pyvista"
+    )
+    def test_scene_built(self, stub_scene, tmp_path):
+        """The html and screenshot are written and recorded in the manifest."""
+        status = build_figures(tmp_path, names=["scene_3d"])
+        assert status == {"scene_3d": "built"}
+        manifest = json.loads((tmp_path / "manifest.json").read_text())
+        artifacts = manifest["scene_3d"]["artifacts"]
+        assert set(artifacts) == {"scene_3d.html", "scene_3d.png"}
+        assert all((tmp_path / x).exists() for x in artifacts)
+
+    def test_missing_backend(self, stub_scene, tmp_path, monkeypatch):
+        """A missing html backend fails the figure without writing it."""
+
+        def _raise(plotter):
+            raise ImportError("install trame-pyvista")
+
+        monkeypatch.setattr(forgery.export, "_get_vtksz_exporter", _raise)
+        status = build_figures(tmp_path, names=["scene_3d"])
+        assert isinstance(status["scene_3d"], ImportError)
+        manifest = json.loads((tmp_path / "manifest.json").read_text())
+        assert "scene_3d" not in manifest
+        assert not (tmp_path / "scene_3d.html").exists()
@@ -2,9 +2,10 @@
 Tests for forgery plotting functions.
 """
 
-from forgery.data import shp_data, csv_data, get_well_data
+from forgery.data import shp_data, csv_data, get_regional_wells, get_well_data
 
 from forgery.plot import plot_event_mag_time, plot_map_2d
+from forgery.stats import get_rolling_magnitude_stats
 
 
 class TestMagTime:
@@ -18,6 +19,14 @@ class TestMagTime:
         # There are weird class hierarchies, just check for the word chart.
         assert "Chart" in str(type(tjaart))
 
+    def test_mag_time_with_stats(self):
+        """Ensure the rolling stats can be added as layers."""
+        df = csv_data["events"]
+        stats_df = get_rolling_magnitude_stats(df)
+        for metric in ["b_value", "rate"]:
+            chart = plot_event_mag_time(df, stats_df=stats_df, stats_metric=metric)
+            assert "Chart" in str(type(chart))
+
 
 class TestMap2D:
     """Test plotting the 2D map."""
@@ -28,3 +37,10 @@ class TestMap2D:
         permit = shp_data["extents"].iloc[1]["geometry"]
         well_map = get_well_data()
         plot_map_2d(df, permit, well_dict=well_map)
+
+    def test_plot_map_regional_wells(self):
+        """Plot the map with the regional wells."""
+        df = csv_data["events"]
+        permit = shp_data["extents"].iloc[1]["geometry"]
+        chart = plot_map_2d(df, permit, regional_wells=get_regional_wells(3_000))
+        assert "Chart" in str(type(chart))
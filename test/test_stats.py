@@ -0,0 +1,85 @@
+"""
+Tests for the rolling magnitude statistics.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forgery.data import csv_data
+from forgery.stats import RollingMagnitudeStats, get_rolling_magnitude_stats
+
+
+class TestRollingMagnitudeStats:
+    """Tests for the incremental statistics."""
+
+    @pytest.fixture(scope="class")
+    def gr_magnitudes(self):
+        """Magnitudes following Gutenberg-Richter with b=1 above M0."""
+        rng = np.random.default_rng(0)
+        beta = 1.0 * np.log(10)
+        # Round to 0.1 like a catalog, starting at the lower bin edge.
+        mags = -0.05 + rng.exponential(1 / beta, 50_000)
+        return np.round(mags, 1)
+
+    def test_b_value(self, gr_magnitudes):
+        """The b-value of a Gutenberg-Richter sample should be ~1."""
+        stats = RollingMagnitudeStats(1, mc_correction=0.0)
+        stats.push(stats.bin_magnitudes(gr_magnitudes))
+        assert stats.mc == pytest.approx(0.0)
+        assert stats.b_value == pytest.approx(1.0, abs=0.03)
+
+    def test_window_drops_old_buckets(self, gr_magnitudes):
+        """Only the last window_buckets should contribute."""
+        stats = RollingMagnitudeStats(2)
+        chunks = np.array_split(gr_magnitudes, 5)
+        for chunk in chunks:
+            stats.push(stats.bin_magnitudes(chunk))
+        expected = stats.bin_magnitudes(np.concatenate(chunks[-2:]))
+        assert np.array_equal(stats.histogram, expected)
+
+    def test_empty(self):
+        """No events should give nan statistics."""
+        stats = RollingMagnitudeStats(3)
+        assert stats.n_events == 0
+        assert np.isnan(stats.mc) and np.isnan(stats.b_value)
+
+
+class TestGetRollingMagnitudeStats:
+    """Tests for the stats of an event catalog."""
+
+    @pytest.fixture(scope="class")
+    def stats_df(self):
+        """The rolling stats of the events."""
+        return get_rolling_magnitude_stats(csv_data["events"])
+
+    def test_output(self, stats_df):
+        """Ensure the expected columns are returned."""
+        assert list(stats_df.columns) == ["time", "n_events", "rate", "mc", "b_value"]
+
+    def test_matches_recompute(self, stats_df):
+        """The incremental counts should match recounting each window."""
+        df = csv_data["events"]
+        for _, row in stats_df.iloc[::37].iterrows():
+            start = row["time"] - pd.Timedelta(hours=24)
+            in_window = (df["time"] >= start) & (df["time"] < row["time"])
+            assert row["n_events"] == in_window.sum()
+
+    def test_empty_catalog(self):
+        """An empty catalog should give an empty frame with the same columns."""
+        out = get_rolling_magnitude_stats(csv_data["events"].iloc[:0])
+        assert out.empty
+        assert list(out.columns) == ["time", "n_events", "rate", "mc", "b_value"]
+
+    @pytest.mark.parametrize(
+        "bucket, window",
+        [
+            (pd.Timedelta(hours=2), pd.Timedelta(hours=1)),
+            (pd.Timedelta(hours=2), pd.Timedelta(hours=5)),
+            (pd.Timedelta(0), pd.Timedelta(hours=5)),
+        ],
+    )
+    def test_bad_window(self, bucket, window):
+        """The window must be a positive multiple of the bucket."""
+        with pytest.raises(ValueError, match="multiple of bucket"):
+            get_rolling_magnitude_stats(csv_data["events"], bucket, window)
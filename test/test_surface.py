@@ -0,0 +1,84 @@
+"""
+Tests for the surface elevation lookup.
+"""
+
+import numpy as np
+import pytest
+
+from forgery.constants import _CSV_DATA_REGISTRY
+from forgery.data import csv_data
+from forgery.surface import SurfaceGrid, add_event_elevation, get_surface_grid
+
+
+@pytest.fixture(scope="module")
+def land_surface_grid():
+    """The registered land surface grid, if its vertex file exists."""
+    if not _CSV_DATA_REGISTRY["surface"].exists():
+        pytest.skip("The land surface vertices are not in the repo.")
+    return get_surface_grid()
+
+
+class TestSurfaceGrid:
+    """Tests for bilinear lookups on a regular grid."""
+
+    @pytest.fixture(scope="class")
+    def planar_grid(self):
+        """A shuffled grid of a plane, which bilinear interpolation recovers."""
+        x, y = np.meshgrid(np.arange(0, 500, 50.0), np.arange(100, 400, 25.0))
+        x, y = x.ravel(), y.ravel()
+        order = np.random.default_rng(0).permutation(len(x))
+        z = 2 * x - 3 * y + 10
+        return SurfaceGrid(x[order], y[order], z[order])
+
+    def test_plane(self, planar_grid):
+        """Interpolating a plane should be exact."""
+        rng = np.random.default_rng(1)
+        x, y = rng.uniform(0, 450, 1000), rng.uniform(100, 375, 1000)
+        assert np.allclose(planar_grid(x, y), 2 * x - 3 * y + 10)
+
+    def test_outside_is_nan(self, planar_grid):
+        """Points off the grid have no elevation."""
+        out = planar_grid([-1, 0, 451], [200, 100, 200])
+        assert np.isnan(out[0]) and np.isnan(out[2])
+        assert out[1] == pytest.approx(-290)
+
+    def test_irregular_raises(self):
+        """Vertices which aren't on a regular grid should raise."""
+        with pytest.raises(ValueError, match="regular grid"):
+            SurfaceGrid([0, 1, 2.5], [0, 0, 0], [1, 2, 3])
+
+    def test_float_noise(self):
+        """Nearly equal coordinates shouldn't make a tiny spacing (huge grid)."""
+        grid = SurfaceGrid([0, 1e-9, 10, 20], [0, 5, 0, 5], [1, 2, 3, 4])
+        assert grid.dx == pytest.approx(10)
+        assert grid.values.shape == (3, 2)
+
+    def test_land_surface(self, land_surface_grid):
+        """The land surface grid should return its own vertex values."""
+        df = csv_data["surface"].iloc[::997]
+        assert np.allclose(land_surface_grid(df["x"], df["y"]), df["z"])
+
+    def test_vertices(self):
+        """The granitoid grid should return its own vertex values."""
+        df = csv_data["granitoid"].iloc[::997]
+        grid = get_surface_grid("granitoid")
+        assert np.allclose(grid(df["x"], df["y"]), df["z"])
+
+
+class TestAddEventElevation:
+    """Tests for adding absolute elevations to events."""
+
+    def test_elevation(self):
+        """Elevation is the surface at the epicenter minus depth."""
+        df = csv_data["events"]
+        grid = get_surface_grid("granitoid")
+        out = add_event_elevation(df, grid)
+        surface = grid(df["east"], df["north"])
+        assert np.allclose(out["elevation"], surface - df["depth"])
+
+    def test_default_grid(self, land_surface_grid):
+        """The land surface is used when no grid is given."""
+        df = csv_data["events"]
+        out = add_event_elevation(df)
+        surface = land_surface_grid(df["east"], df["north"])
+        assert np.allclose(out["elevation"], surface - df["depth"], equal_nan=True)
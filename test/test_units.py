@@ -0,0 +1,62 @@
+"""
+Tests for the unit conversion layer.
+"""
+
+import numpy as np
+import pytest
+
+import forgery.units
+from forgery.units import convert, get_conversion_factor
+
+
+class TestConversionFactor:
+    """Tests for resolving unit strings to factors."""
+
+    @pytest.fixture(autouse=True)
+    def pint(self):
+        """Pint is optional; it is only needed to validate the fast path."""
+        return pytest.importorskip("pint")
+
+    @pytest.mark.parametrize("unit", ["ft", "m", "km", "in", "mile"])
+    def test_matches_pint(self, unit, pint):
+        """Table factors should match pint."""
+        expected = pint.Quantity(1.0, unit).to("m").magnitude
+        assert get_conversion_factor(unit) == pytest.approx(expected, rel=1e-12)
+
+    def test_unknown_unit_uses_pint(self):
+        """Units missing from the table are resolved with pint."""
+        assert get_conversion_factor("yard") == pytest.approx(0.9144)
+
+    def test_validate(self, monkeypatch):
+        """In validation mode a bad table factor should raise."""
+        monkeypatch.setattr(forgery.units, "VALIDATE_UNITS", True)
+        monkeypatch.setitem(forgery.units._METERS_PER_UNIT, "ft", 0.3)
+        forgery.units._get_table_factor.cache_clear()
+        try:
+            with pytest.raises(ValueError, match="disagrees with pint"):
+                get_conversion_factor("ft")
+        finally:
+            forgery.units._get_table_factor.cache_clear()
+
+
+class TestConvert:
+    """Tests for converting values."""
+
+    def test_scalar(self):
+        """Scalars return floats."""
+        assert convert(10, "ft") == pytest.approx(3.048)
+
+    def test_inplace(self):
+        """In place conversion should modify and return the same array."""
+        values = np.arange(4, dtype=float)
+        out = convert(values, "ft", inplace=True)
+        assert out is values
+        assert np.allclose(values, np.arange(4) * 0.3048)
+
+    def test_copy(self):
+        """By default the input is not modified."""
+        values = np.arange(4, dtype=float)
+        out = convert(values, "km")
+        assert out is not values
+        assert np.allclose(values, np.arange(4))
+        assert np.allclose(out, np.arange(4) * 1_000)
@@ -2,18 +2,53 @@
 Tests for plotting things with pyvista.
 """
 
+import numpy as np
 import pytest
+import pyvista as pv
 
+from forgery.constants import _CSV_DATA_REGISTRY
+from forgery.data import csv_data
 from forgery.vista import ForgeVistaScene
 
 
+class _GranitoidScene(ForgeVistaScene):
+    """
+    A scene using the granitoid as the land surface (the land surface
+    vertices aren't in the repo) with some events moved off the grid.
+    """
+
+    @property
+    def surface_df(self):
+        return csv_data["granitoid"]
+
+    @property
+    def event_df(self):
+        df = csv_data["events"]
+        df = df[df["magnitude"] > self.mag_min].iloc[:50].copy()
+        df.loc[df.index[:5], "east"] = -1e9
+        return df
+
+
 class TestVista:
     """Simply scene creation test."""
 
     @pytest.fixture()
     def default_scene(self):
         """Get the default forge pyvista scene."""
+        if not _CSV_DATA_REGISTRY["surface"].exists():
+            pytest.skip("The land surface vertices are not in the repo.")
         return ForgeVistaScene()()
 
     def test_scene_creation(self, default_scene):
         """Ensure the scene was created."""
+
+
+class TestEventGlyphs:
+    """Tests for the event glyphs."""
+
+    def test_events_off_surface_dropped(self):
+        """Events without a surface elevation shouldn't make nan glyphs."""
+        glyphs = _GranitoidScene().get_event_glyphs(resolution=8)
+        sphere = pv.Sphere(theta_resolution=8, phi_resolution=8)
+        assert np.isfinite(glyphs.points).all()
+        assert glyphs.n_points == 45 * sphere.n_points